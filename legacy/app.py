@@ -1,13 +1,18 @@
+import os
+import sys
 import numpy as np
 import pandas as pd
-import seaborn as sns
 import streamlit as st
 import matplotlib.pyplot as plt
 
 from scipy.stats import norm
 from collections import Counter
 from matplotlib import font_manager, rc
+
+# src/의 utils 모듈(function 모듈도 사용)을 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
 from function import create_styled_bar_chart, CATEGORIES, QUESTIONS, analyze_categorical_responses, load_data
+from utils.filter_cube import FilterCube
 
 ## 폰트 설정
 try:
@@ -19,15 +24,47 @@ font_manager.fontManager.addfont(font_path)
 plt.rcParams['font.family'] = font_manager.FontProperties(fname=font_path).get_name()
 plt.rcParams['axes.unicode_minus'] = False
 
-## 데이터 로드
-df = pd.read_excel("./data/SR_ROW.xlsx", sheet_name="308명")
-df = df.dropna(subset=['연령']) # 결측치 제거
+# 근속년수 필터를 위해 mapping 정의
+tenure_options = {
+    "1년 미만": 1,
+    "3년 미만": 3,
+    "5년 미만": 5,
+    "10년 미만": 10,
+    "15년 미만": 15,
+    "20년 미만": 20
+}
+TENURE_THRESHOLDS = list(tenure_options.values())
+FILTER_DIMS = ['연령대', '본사/현업', '근속구간']
+
+
+def tenure_filter(label):
+    """'근속년수 < t' 조건에 해당하는 근속구간 목록 (구간 i = [t_{i-1}, t_i), NaN은 마지막 구간)"""
+    return list(range(TENURE_THRESHOLDS.index(tenure_options[label]) + 1))
+
+
+@st.cache_resource(show_spinner="데이터를 불러오는 중...")
+def load_workstyle_data():
+    """
+    데이터 로드 및 (연령대, 본사/현업, 근속구간) cell별 WORK_ 컬럼 집계 cube 생성
+
+    필터 위젯이 바뀌어도 행을 다시 필터링하지 않고 cube의 cell들을 더해서 통계/KDE를 계산한다.
+    (cache_resource이므로 반환된 DataFrame은 수정하지 않는다.)
+    """
+    df = pd.read_excel("./data/SR_ROW.xlsx", sheet_name="308명")
+    df = df.dropna(subset=['연령']) # 결측치 제거
+
+    work_columns = [col for col in df.columns if "(WORK_" in col] # WORK_ 컬럼 추출
+    df['연령대'] = df['연령'].apply(lambda x: f"{int(x//10*10)}대") # 연령대 컬럼 생성
+    df['근속구간'] = np.searchsorted(TENURE_THRESHOLDS, df['근속년수'].to_numpy(dtype=float), side='right')
+
+    return df, work_columns, FilterCube(df, FILTER_DIMS, work_columns)
 
-work_columns = [col for col in df.columns if "(WORK_" in col] # WORK_ 컬럼 추출
-df['연령대'] = df['연령'].apply(lambda x: f"{int(x//10*10)}대") # 연령대 컬럼 생성
+
+## 데이터 로드
+df, work_columns, cube = load_workstyle_data()
 
 # 전체 데이터 기반 mean, std 계산(기본용)
-grouped_stats = df.groupby('연령대')[work_columns].agg(['mean', 'std'])
+grouped_stats = cube.stats(cube.cell_mask({}), '연령대')
 
 # mean 값(기본)
 mean_values = grouped_stats.xs('mean', level=1, axis=1)
@@ -45,16 +82,6 @@ categories = [c.split("(WORK_")[1].replace(")", "") for c in work_columns]
 st.title("WorkStyle 시각화")
 tab1, tab2, tab3 = st.tabs(["Work_Style별 그래프", "연령대별 Work_Style 레이더 차트", "카테고리별 응답 분석"])
 
-# 근속년수 필터를 위해 mapping 정의
-tenure_options = {
-    "1년 미만": 1,
-    "3년 미만": 3,
-    "5년 미만": 5,
-    "10년 미만": 10,
-    "15년 미만": 15,
-    "20년 미만": 20
-}
-
 with tab1:
     st.header("Work_Style별 그래프")
 
@@ -70,28 +97,23 @@ with tab1:
 
     # 근속년수 필터
     selected_tenure_label = st.selectbox("근속년수 기준을 선택하세요:", options=list(tenure_options.keys()))
-    selected_tenure = tenure_options[selected_tenure_label]
-
-    # 필터 적용
-    filtered_df = df[
-        df['연령대'].isin(selected_ages) &
-        df['본사/현업'].isin(selected_positions) &
-        (df['근속년수'] < selected_tenure)
-    ]
-
-    if selected_work_col and len(filtered_df) > 0:
-        if len(filtered_df['연령대'].unique()) > 0:
-            filtered_grouped_stats = filtered_df.groupby('연령대')[selected_work_col].agg(['mean', 'std'])
-        else:
-            filtered_grouped_stats = pd.DataFrame()
+
+    # 필터 적용 (행 대신 cube cell 선택)
+    mask = cube.cell_mask({
+        '연령대': selected_ages,
+        '본사/현업': selected_positions,
+        '근속구간': tenure_filter(selected_tenure_label)
+    })
+
+    if selected_work_col and cube.rows[mask].sum() > 0:
+        filtered_grouped_stats = cube.stats(mask, '연령대', [selected_work_col])[selected_work_col][['mean', 'std']]
 
         # KDE 플롯
         fig_kde = plt.figure(figsize=(10, 6))
-        unique_ages_in_filtered = filtered_df['연령대'].unique()
-        for age_group in unique_ages_in_filtered:
-            age_group_data = filtered_df[filtered_df['연령대'] == age_group][selected_work_col]
-            if len(age_group_data) > 0:
-                sns.kdeplot(data=age_group_data, label=f"{age_group}")
+        grid, densities, age_groups = cube.kde(mask, '연령대', selected_work_col)
+        for age_group, density in zip(age_groups, densities):
+            if (density > 0).any():
+                plt.plot(grid, density, label=f"{age_group}")
         plt.title(f"{selected_work_col} 연령대별 분포(KDE)")
         plt.xlabel(selected_work_col)
         plt.ylabel("Density")
@@ -130,18 +152,17 @@ with tab2:
 
     # 근속년수 필터 (레이더 차트용)
     radar_selected_tenure_label = st.selectbox("근속년수 기준을 선택하세요:(레이더)", options=list(tenure_options.keys()), key="radar_tenure")
-    radar_selected_tenure = tenure_options[radar_selected_tenure_label]
-
-    # 레이더 차트용 필터 적용
-    radar_filtered_df = df[
-        df['연령대'].isin(radar_selected_ages) &
-        df['본사/현업'].isin(radar_selected_positions) &
-        (df['근속년수'] < radar_selected_tenure)
-    ]
-
-    if len(radar_filtered_df) > 0 and len(radar_selected_ages) > 0:
-        # 필터링된 데이터로 mean 재계산
-        radar_grouped_stats = radar_filtered_df.groupby('연령대')[work_columns].mean()
+
+    # 레이더 차트용 필터 적용 (행 대신 cube cell 선택)
+    radar_mask = cube.cell_mask({
+        '연령대': radar_selected_ages,
+        '본사/현업': radar_selected_positions,
+        '근속구간': tenure_filter(radar_selected_tenure_label)
+    })
+
+    if cube.rows[radar_mask].sum() > 0 and len(radar_selected_ages) > 0:
+        # 선택된 cell들로 mean 재계산
+        radar_grouped_stats = cube.stats(radar_mask, '연령대').xs('mean', level=1, axis=1)
 
         # 레이더 차트 그리기
         N = len(categories_kor)
@@ -1,3 +1,5 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -5,6 +7,10 @@ import plotly.express as px
 from collections import Counter
 import re
 
+# src/의 공용 통계 엔진 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from utils.group_stats import group_stats
+
 # 상수 정의
 CULTURE_PROGRAMS = [
     'CEO의 릴레이 소통 활동',
@@ -118,60 +124,30 @@ def create_styled_bar_chart(data, title, x_label, y_label, color_sequence=None):
     
     return fig
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_group_stats(df, keys, columns, sort=True):
+    """(데이터 내용, 그룹 key, 컬럼) 단위로 캐시되는 group_stats (df는 streamlit이 내용 기준으로 해시)"""
+    return group_stats(df, keys, columns, sort=sort)
+
 def analyze_categorical_responses(df, category):
     try:
         # 다중선택 문항 제외한 질문들만 선택
         score_questions = [q for q in QUESTIONS if q not in QUESTIONS[-2:]]
         
-        def calculate_stats_by_category(data, questions):
-            result = {}
-            for question in questions:
-                question_data = data[question].dropna()
-                result[question] = {
-                    '평균': round(question_data.mean(), 2) if not question_data.empty else 0.0,
-                    '표준편차': round(question_data.std(), 2) if len(question_data) > 1 else 0.0
-                }
-            return result
-        
-        # 카테고리가 '전체'인 경우와 아닌 경우 분리
-        if category == '전체':
-            # 전체 통계만 계산
-            stats_data = {'전체': calculate_stats_by_category(df, score_questions)}
-            index = ['전체']
-        else:
-            # 전체 통계 계산
-            stats_data = {'전체': calculate_stats_by_category(df, score_questions)}
-            
-            # 카테고리별 통계 계산 (None 값 제외)
-            for cat in df[category].unique():
-                if pd.notna(cat):  # None 값 제외
-                    cat_data = df[df[category] == cat]
-                    stats_data[cat] = calculate_stats_by_category(cat_data, score_questions)
-            
-            index = ['전체'] + [cat for cat in df[category].unique() if pd.notna(cat)]
+        # 전체 통계 + 카테고리별 통계 (None 값 제외, 등장 순서 유지)를 각각 한 번의 groupby로 계산
+        stats = cached_group_stats(df, [], score_questions)
+        if category != '전체':
+            by_category = cached_group_stats(df, [category], score_questions, sort=False)
+            stats = pd.concat([stats, by_category])
         
-        # 데이터프레임 생성을 위한 데이터 준비
-        result_data = []
-        
-        for idx in index:
-            row_data = []
-            stats = stats_data[idx]
-            
-            for question in score_questions:
-                row_data.extend([
-                    stats[question]['평균'],
-                    stats[question]['표준편차']
-                ])
-            
-            result_data.append(row_data)
+        # 값이 없으면 평균 0, 표본이 1개 이하이면 표준편차 0 (기존 계산과 동일)
+        stats = stats.loc[:, pd.MultiIndex.from_product([score_questions, ['mean', 'std']])].fillna(0.0).round(2)
         
         # 멀티인덱스 컬럼 생성
         metric_columns = ['평균', '표준편차']
         column_tuples = [(f'{i+1}번', metric) for i, _ in enumerate(score_questions) for metric in metric_columns]
-        columns = pd.MultiIndex.from_tuples(column_tuples)
-        
-        # 데이터프레임 생성
-        stats = pd.DataFrame(result_data, index=index, columns=columns)
+        stats.columns = pd.MultiIndex.from_tuples(column_tuples)
+        stats.index = list(stats.index)
         return stats
 
     except Exception as e:
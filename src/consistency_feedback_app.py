@@ -1,3 +1,4 @@
+import os
 import re
 import streamlit as st
 import matplotlib.pyplot as plt
@@ -5,12 +6,37 @@ from matplotlib import font_manager
 
 from utils.font import get_font_path
 from utils.culture_fit_visualize import vision_radar, workstyle_radar
-from utils.file import load_json, save_to_json_file, save_feedback, load_feedback
+from utils.record_store import RecordStore
+from utils.feedback_store import FeedbackStore
 
 FEEDBACK_FILE = "../data/feedback_results.json"
+FEEDBACK_DB = "../data/feedback_results.sqlite"
+PREFETCH_SIZE = 3
+
+
+def file_version(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+@st.cache_resource(show_spinner="데이터 인덱스를 불러오는 중...")
+def open_record_store(path, version):
+    # rerun 사이에 공유되며, 실제 레코드는 요청된 인덱스만 읽는다.
+    # version(파일 크기, 수정 시각)이 cache key에 포함되므로 inference로 파일이 다시 생성되면 새로 연다.
+    return RecordStore(path)
+
+
+def open_record_stores(*paths):
+    return [open_record_store(path, file_version(path)) for path in paths]
+
+
+@st.cache_resource
+def open_feedback_store():
+    # 기존 feedback_results.json이 있으면 최초 1회 가져온다.
+    return FeedbackStore(FEEDBACK_DB, legacy_json=FEEDBACK_FILE)
 
 # 페이지 렌더링 함수
-def render_page(idx, dataset, vision_comments, workstyle_comments, summary_comments, feedback_data):
+def render_page(idx, dataset, vision_comments, workstyle_comments, summary_comments, feedback_store, reviewer):
     st.title(f"Data Review: Index {idx}")
 
     data = dataset[idx]
@@ -91,25 +117,18 @@ def render_page(idx, dataset, vision_comments, workstyle_comments, summary_comme
         feedback_key = f"feedback_{idx}"
         feedback = st.text_area("피드백을 입력하세요:", height=100, key=feedback_key)
         
+        # 리뷰어 이름이 비어 있으면 익명 피드백끼리 (idx, "") key를 공유해 서로 덮어쓰므로 제출을 막는다.
+        if not reviewer:
+            st.warning("사이드바에 리뷰어 이름을 입력해야 피드백을 제출할 수 있습니다.")
+
         # Form으로 감싸서 한 번에 제출되도록 변경
         with st.form(key=f"feedback_form_{idx}"):
-            submit_button = st.form_submit_button("완료")
+            submit_button = st.form_submit_button("완료", disabled=not reviewer)
             
-            if submit_button:
+            if submit_button and reviewer:
                 if selected_option:
-                    feedback_entry = {
-                        "index": idx,
-                        "selected_option": selected_option,
-                        "feedback": feedback.strip(),
-                    }
-                    
-                    existing_index = next((i for i, x in enumerate(feedback_data) if x["index"] == idx), None)
-                    if existing_index is not None:
-                        feedback_data[existing_index] = feedback_entry
-                    else:
-                        feedback_data.append(feedback_entry)
-                    
-                    save_feedback(FEEDBACK_FILE, feedback_data)
+                    # (index, reviewer) 단위 upsert이므로 다른 리뷰어의 피드백을 덮어쓰지 않는다.
+                    feedback_store.upsert(idx, selected_option, feedback.strip(), reviewer)
                     st.success("피드백이 저장되었습니다!")
                     
                     # 세션 상태 업데이트 후 즉시 rerun
@@ -119,23 +138,29 @@ def render_page(idx, dataset, vision_comments, workstyle_comments, summary_comme
                     st.error("옵션을 선택해주세요!")
 
 def main():
-    # 데이터 로드
-    dataset = load_json("../data/dev-survey-result.json")
-    vision_comments = load_json("../data/vision_output.json")
-    workstyle_comments = load_json("../data/workstyle_output.json")
-    summary_comments = load_json("../data/summary_output.json")
+    # Streamlit 설정 (캐시 spinner보다 먼저 호출되어야 함)
+    st.set_page_config(page_title="EDA Dashboard", layout="wide")
 
-    assert len(dataset) == len(vision_comments) == len(workstyle_comments) == len(summary_comments)
+    # 데이터 로드 (인덱스만 열고 레코드는 필요할 때 읽음)
+    dataset, vision_comments, workstyle_comments, summary_comments = open_record_stores(
+        "../data/dev-survey-result.json",
+        "../data/vision_output.json",
+        "../data/workstyle_output.json",
+        "../data/summary_output.json"
+    )
 
-    # Streamlit 설정
-    st.set_page_config(page_title="EDA Dashboard", layout="wide")
+    assert len(dataset) == len(vision_comments) == len(workstyle_comments) == len(summary_comments)
 
     # 초기 상태 설정
     if "idx" not in st.session_state:
         st.session_state.idx = 0  # 현재 데이터 인덱스
 
-    # 기존 피드백 로드
-    feedback_data = load_feedback(FEEDBACK_FILE)
+    # 피드백 저장소 및 리뷰어 설정
+    feedback_store = open_feedback_store()
+    reviewer = st.sidebar.text_input("리뷰어 이름", key="reviewer").strip()
+    if st.sidebar.button("피드백 JSON 내보내기"):
+        feedback_store.export_json(FEEDBACK_FILE)
+        st.sidebar.success(f"{FEEDBACK_FILE}에 저장되었습니다.")
 
     # 현재 인덱스
     idx = st.session_state.idx
@@ -145,8 +170,12 @@ def main():
         st.title("모든 데이터가 처리되었습니다.")
         st.stop()
 
+    # 다음 페이지 레코드를 미리 읽어 두어 페이지 이동을 즉시 처리
+    for store in (dataset, vision_comments, workstyle_comments, summary_comments):
+        store.prefetch(range(idx + 1, idx + 1 + PREFETCH_SIZE))
+
     # 페이지 렌더링
-    render_page(idx, dataset, vision_comments, workstyle_comments, summary_comments, feedback_data)
+    render_page(idx, dataset, vision_comments, workstyle_comments, summary_comments, feedback_store, reviewer)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
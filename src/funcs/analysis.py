@@ -0,0 +1,60 @@
+import os
+import sys
+import argparse
+
+import openai
+import pandas as pd
+
+from processors.openai_processor import openai_api_key
+from utils.calculates import analyze_responses, visualize_results
+
+DEFAULT_EMBED_MODEL = "text-embedding-3-large"
+DEFAULT_NUM_GRAM = 5
+
+
+def default_store_path(result_path):
+    """결과 파일 옆의 임베딩 저장소 경로 (예: prompt_ver1-30_samples.csv -> prompt_ver1-30_samples_embeddings)"""
+    return os.path.splitext(result_path)[0] + "_embeddings"
+
+
+def analyze_result_file(result_path, client, ng_gram=DEFAULT_NUM_GRAM, embed_model=DEFAULT_EMBED_MODEL,
+                        store_path=None, output_dir=None):
+    """
+    실행 결과 CSV(iteration, response, type [, record, variant])의 유사도를 분석하고 그래프를 저장
+
+    임베딩은 store_path(기본값: 결과 파일 옆 *_embeddings)의 EmbeddingStore에 저장되므로,
+    같은 결과 파일을 다시 분석하면 임베딩 API를 호출하지 않는다.
+
+    Args:
+        store_path (str): 임베딩 저장소 경로. 빈 문자열이면 저장소를 사용하지 않음
+        output_dir (str): 그래프 저장 위치 (기본값: 결과 파일과 같은 디렉토리)
+    """
+    df = pd.read_csv(result_path, encoding="utf-8-sig")
+    store_path = default_store_path(result_path) if store_path is None else store_path or None
+    analysis_results = analyze_responses(df, client, ng_gram, embed_model, store_path=store_path)
+
+    prefix = os.path.splitext(os.path.basename(result_path))[0]
+    visualize_results(analysis_results, df, client, output_dir or os.path.dirname(result_path) or ".", prefix)
+    return analysis_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실행 결과 CSV의 의미 / n-gram 유사도 분석")
+    parser.add_argument("result_path", help="iteration, response, type 컬럼을 가진 결과 CSV")
+    parser.add_argument("--ngram", type=int, default=DEFAULT_NUM_GRAM, help="최대 n-gram 크기")
+    parser.add_argument("--embed-model", default=DEFAULT_EMBED_MODEL)
+    parser.add_argument("--store", default=None, help="임베딩 저장소 경로 (기본값: 결과 파일 옆 *_embeddings, ''이면 미사용)")
+    parser.add_argument("--output-dir", default=None, help="그래프 저장 위치 (기본값: 결과 파일 디렉토리)")
+    args = parser.parse_args(argv)
+
+    client = openai.OpenAI(api_key=openai_api_key, max_retries=0)
+    analysis_results = analyze_result_file(args.result_path, client, ng_gram=args.ngram, embed_model=args.embed_model,
+                                           store_path=args.store, output_dir=args.output_dir)
+    for response_type, metrics in analysis_results.items():
+        print(f"{response_type} : semantic {metrics['semantic_similarity']:.4f}, "
+              f"n-gram {[round(value, 4) for value in metrics['n_gram_similarities']]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import asyncio
+from itertools import islice
+
+from tqdm import tqdm
+
+from utils.journal import RunJournal
+from utils.file import save_to_json_file
+from utils.dataset_io import iter_records
+from utils.llm_metrics import metric_labels, record_cache_hits
+from utils.completion_cache import CompletionCache, resolve_cache
+from processors.openai_processor import openai_client
+from processors.rate_limiter import get_rate_limiter
+from processors.cot_prompt_processor import prompt_input_processing
+from processors.data_processor import process_vision_result, extract_workstyle_info, process_batch
+
+from processors.prompt_processor import vision_prompt, workstyle_prompt, summary_prompt
+from processors.cot_prompt_processor import (vision_prompt as cot_vision_prompt,
+                                             workstyle_prompt as cot_workstyle_prompt,
+                                             summary_prompt as cot_summary_prompt)
+
+# section -> variant -> system prompt
+# 출력 파일 구조({"original": [...], "advanced": [...]})와 동일한 순서를 유지한다.
+SECTION_PROMPTS = {
+    "vision": {"original": vision_prompt, "advanced": cot_vision_prompt},
+    "workstyle": {"original": workstyle_prompt, "advanced": cot_workstyle_prompt},
+    "summary": {"original": summary_prompt, "advanced": cot_summary_prompt},
+}
+# variant별 system prompt 버전 (metrics 라벨)
+VARIANT_PROMPT_VERSIONS = {"original": "v1", "advanced": "cot"}
+
+
+def build_section_inputs(hr_data_dict: dict) -> dict:
+    """레코드 하나에 대해 section별 user input 문자열을 생성"""
+    vision_data = process_vision_result(hr_data_dict['visionResult'], hr_data_dict['summaryResult'])
+    workstyle_data = extract_workstyle_info(hr_data_dict['workstyleResult'], hr_data_dict['summaryResult'])
+    vision_input, workstyle_input, summary_input = prompt_input_processing(hr_data_dict, vision_data, workstyle_data)
+
+    return {"vision": vision_input, "workstyle": workstyle_input, "summary": summary_input}
+
+
+def build_batch_inputs(dataset, batch_size=10_000) -> list:
+    """
+    dataset 전체의 section별 user input 문자열 목록을 batch_size 레코드 단위로 생성
+
+    batch마다 process_batch로 전처리를 한 번에 하고, 레코드 원본은 해당 batch가 끝나면 버린다.
+    결과는 레코드마다 build_section_inputs를 호출한 것과 같다.
+    """
+    records = iter(dataset)
+    inputs = []
+    while batch := list(islice(records, batch_size)):
+        vision_data, workstyle_data = process_batch(batch)
+        for hr_data_dict, vision, workstyle in zip(batch, vision_data, workstyle_data):
+            vision_input, workstyle_input, summary_input = prompt_input_processing(hr_data_dict, vision, workstyle)
+            inputs.append({"vision": vision_input, "workstyle": workstyle_input, "summary": summary_input})
+    return inputs
+
+
+def build_jobs(num_records: int, n_iter: int) -> list:
+    """(record, section, variant, iteration) 단위의 작업 목록 생성"""
+    return [
+        (idx, section, variant, iteration)
+        for idx in range(num_records)
+        for section, variants in SECTION_PROMPTS.items()
+        for variant in variants
+        for iteration in range(1, n_iter + 1)
+    ]
+
+
+def assemble_results(num_records: int, completed: dict) -> dict:
+    """
+    완료된 작업 결과를 기존 *_output.json 구조로 변환
+
+    Args:
+        completed (dict): {(idx, section, variant, iteration): response}
+    Returns:
+        dict: {section: [{"original": [...], "advanced": [...]}, ...]}
+    """
+    results = {
+        section: [{variant: [] for variant in variants} for _ in range(num_records)]
+        for section, variants in SECTION_PROMPTS.items()
+    }
+
+    for (idx, section, variant, iteration), response in sorted(completed.items()):
+        results[section][idx][variant].append({
+            "iteration": iteration,
+            "response": response
+        })
+
+    return results
+
+
+def request_messages(prompt, user_input) -> list:
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": user_input}
+    ]
+
+
+def request_key(model, prompt, user_input, temperature, iteration) -> str:
+    """
+    completion 캐시와 저널에 쓰는 요청 key
+
+    run_openai_api와 동일한 key를 사용하므로 동기/비동기/batch 실행 간 캐시와 저널이 공유된다.
+    """
+    return CompletionCache.make_key(model=model, messages=request_messages(prompt, user_input),
+                                    temperature=temperature, iteration=iteration)
+
+
+def job_request_key(job, inputs, model, temperature) -> str:
+    idx, section, variant, iteration = job
+    return request_key(model, SECTION_PROMPTS[section][variant], inputs[idx][section], temperature, iteration)
+
+
+async def run_job(client, semaphore, model, prompt, user_input, temperature, iteration, cache=None):
+    messages = request_messages(prompt, user_input)
+    cache_key = request_key(model, prompt, user_input, temperature, iteration)
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_cache_hits("chat", model)
+            return cached
+
+    async with semaphore:
+        completion = await get_rate_limiter(model).call_async(
+            client.chat.completions.with_raw_response.create,
+            model=model,
+            messages=messages,
+            temperature=temperature
+        )
+    response = completion.choices[0].message.content
+    if cache:
+        cache.put(cache_key, response)
+    return response
+
+
+async def run_inference(dataset, client=None, n_iter=1, temperature=0, max_concurrency=16, model="gpt-4o", cache=None,
+                        journal=None):
+    """
+    모든 (record, section, variant, iteration) 작업을 동시에 실행
+
+    Args:
+        dataset (iterable): dev-survey-result 레코드 (리스트 또는 iter_records generator)
+        client (openai.AsyncOpenAI): None이면 processors.openai_processor의 client 사용
+        max_concurrency (int): 동시에 진행할 최대 요청 수
+        cache (CompletionCache): None이면 기본 캐시, False이면 캐시 사용 안 함
+        journal (RunJournal): 지정 시 완료된 작업을 즉시 기록하고, 이미 기록된 작업은 건너뜀
+    Returns:
+        dict: {section: [{"original": [...], "advanced": [...]}, ...]}
+    """
+    client = client or openai_client
+    cache = resolve_cache(cache)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # 레코드 원본은 보관하지 않고 section별 입력 문자열만 남긴다.
+    inputs = build_batch_inputs(dataset)
+    num_records = len(inputs)
+    print(f"Total data : {num_records}")
+    jobs = build_jobs(num_records, n_iter)
+
+    # 현재 dataset/n_iter 범위를 벗어나거나 prompt/입력이 바뀐 저널 항목은 무시한다.
+    request_keys = {job: job_request_key(job, inputs, model, temperature) for job in jobs}
+    completed = journal.load_valid(request_keys) if journal else {}
+    if completed:
+        jobs = [job for job in jobs if job not in completed]
+        print(f"Resuming from journal : {len(completed)} done, {len(jobs)} remaining")
+
+    async def run(job):
+        idx, section, variant, iteration = job
+        prompt = SECTION_PROMPTS[section][variant]
+        with metric_labels(prompt_version=VARIANT_PROMPT_VERSIONS[variant], section=section, variant=variant):
+            response = await run_job(client, semaphore, model, prompt, inputs[idx][section], temperature, iteration,
+                                     cache)
+        return job, response
+
+    tasks = [asyncio.ensure_future(run(job)) for job in jobs]
+    try:
+        for future in tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            job, response = await future
+            completed[job] = response
+            if journal:
+                journal.append(job, response, request_keys[job])
+    finally:
+        # 하나라도 실패하면 남은 요청은 취소하고, 취소가 끝날 때까지 기다린다.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # 취소 전에 끝났지만 아직 꺼내지 않은 결과도 저널에 남겨 다시 요청하지 않도록 한다.
+        for task in tasks:
+            if task.cancelled() or task.exception() is not None:
+                continue
+            job, response = task.result()
+            if job not in completed:
+                completed[job] = response
+                if journal:
+                    journal.append(job, response, request_keys[job])
+
+    if cache:
+        print(f"Completion cache : {cache.stats()}")
+
+    return assemble_results(num_records, completed)
+
+
+def save_results(results, output_dir):
+    for section, section_results in results.items():
+        save_to_json_file(section_results, f"{output_dir}/{section}_output.json")
+
+
+def main():
+    n_iter = 1
+    temperature = 0
+    max_concurrency = 16
+    journal_path = "../result/inference_journal.jsonl"
+
+    dataset = iter_records("../data/dev-survey-result.json")
+
+    results = asyncio.run(run_inference(dataset, n_iter=n_iter, temperature=temperature,
+                                        max_concurrency=max_concurrency, journal=RunJournal(journal_path)))
+    save_results(results, "../result")
+
+
+if __name__ == "__main__":
+    main()
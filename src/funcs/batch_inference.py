@@ -0,0 +1,276 @@
+import os
+import json
+import time
+
+import openai
+
+from utils.journal import RunJournal
+from utils.dataset_io import iter_records, write_records
+from utils.llm_metrics import record_call, record_cache_hits
+from utils.completion_cache import resolve_cache
+from processors.openai_processor import openai_api_key
+from funcs.async_inference import (SECTION_PROMPTS, VARIANT_PROMPT_VERSIONS, job_request_key, request_messages,
+                                   assemble_results, build_batch_inputs, build_jobs, save_results)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+# Batch API 입력 파일 한도 (요청 50,000건 / 200MB)
+MAX_REQUESTS_PER_BATCH = 50_000
+MAX_BYTES_PER_BATCH = 190 * 1024 * 1024
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# files/batches 호출은 rate limiter를 거치지 않으므로 SDK 재시도를 사용한다.
+SDK_MAX_RETRIES = 2
+
+
+def job_custom_id(job) -> str:
+    return ":".join(str(part) for part in job)
+
+
+def parse_custom_id(custom_id) -> tuple:
+    idx, section, variant, iteration = custom_id.split(":")
+    return int(idx), section, variant, int(iteration)
+
+
+def job_messages(job, inputs) -> list:
+    idx, section, variant, _ = job
+    return request_messages(SECTION_PROMPTS[section][variant], inputs[idx][section])
+
+
+def build_batch_requests(jobs, inputs, model, temperature) -> list:
+    """작업마다 Batch API 입력 한 줄({"custom_id", "method", "url", "body"})을 생성"""
+    return [
+        {
+            "custom_id": job_custom_id(job),
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {"model": model, "messages": job_messages(job, inputs), "temperature": temperature}
+        }
+        for job in jobs
+    ]
+
+
+def split_requests(requests, max_requests=MAX_REQUESTS_PER_BATCH, max_bytes=MAX_BYTES_PER_BATCH):
+    """Batch API 파일 한도를 넘지 않도록 요청을 나눈다."""
+    chunk, size = [], 0
+    for request in requests:
+        request_size = len(json.dumps(request, ensure_ascii=False).encode("utf-8")) + 1
+        if chunk and (len(chunk) >= max_requests or size + request_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(request)
+        size += request_size
+    if chunk:
+        yield chunk
+
+
+def submit_batch(client, requests_path, metadata=None) -> str:
+    """요청 JSONL 파일을 업로드하고 batch를 생성하여 batch id 반환"""
+    with open(requests_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+        metadata=metadata
+    )
+    return batch.id
+
+
+def wait_for_batch(client, batch_id, poll_interval=60, timeout=None):
+    """batch가 종료 상태(completed/failed/expired/cancelled)가 될 때까지 polling"""
+    started = time.monotonic()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+
+        counts = batch.request_counts
+        if counts is not None:
+            print(f"Batch {batch_id} : {batch.status} ({counts.completed}/{counts.total}, failed {counts.failed})")
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"batch {batch_id} did not finish within {timeout}s (status: {batch.status})")
+        time.sleep(poll_interval)
+
+
+def read_batch_output(client, batch) -> tuple:
+    """
+    batch 결과/오류 파일을 읽어 작업별 응답으로 변환
+
+    Returns:
+        tuple: ({job: response}, {job: error message}, {job: usage})
+    """
+    responses, errors, usages = {}, {}, {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            job = parse_custom_id(entry["custom_id"])
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                responses[job] = response["body"]["choices"][0]["message"]["content"]
+                usages[job] = response["body"].get("usage")
+            else:
+                errors[job] = json.dumps(entry.get("error") or response.get("body"), ensure_ascii=False)
+
+    if batch.error_file_id:
+        for line in client.files.content(batch.error_file_id).text.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                errors[parse_custom_id(entry["custom_id"])] = json.dumps(entry.get("error"), ensure_ascii=False)
+    return responses, errors, usages
+
+
+def batch_errors(batch) -> list:
+    """
+    batch 자체의 오류 목록 (입력 파일 검증 실패 등). 이 경우 결과/오류 파일 없이 failed 상태가 된다.
+
+    Returns:
+        list: "line N: [code] message" 형태의 문자열
+    """
+    errors = getattr(batch, "errors", None)
+    messages = []
+    for error in (getattr(errors, "data", None) or []):
+        line = f"line {error.line}: " if getattr(error, "line", None) is not None else ""
+        messages.append(f"{line}[{error.code}] {error.message}")
+    return messages
+
+
+def load_batch_state(state_file) -> list:
+    """
+    제출했지만 아직 결과를 반영하지 않은 batch 목록 [{"id", "requests", "keys"}]
+
+    keys는 제출 당시 {custom_id: 요청 key}로, 재개 시 현재 요청과 비교하는 데 쓴다.
+    """
+    if not os.path.exists(state_file):
+        return []
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_batch_state(batches, state_file):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(batches, f, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+def run_batch_inference(dataset, client, n_iter=1, temperature=0, model="gpt-4o", work_dir="../result/batch",
+                        cache=None, journal=None, poll_interval=60, timeout=None):
+    """
+    모든 (record, section, variant, iteration) 작업을 Batch API로 실행하고 기존 *_output.json 구조로 반환
+
+    - 캐시/저널에 이미 있는 작업은 제출하지 않는다.
+    - 제출한 batch id는 work_dir/batches.json에 기록하므로, 중단 후 다시 실행하면 새로 제출하지 않고
+      기존 batch의 완료를 기다린다.
+    - 실패한 요청은 결과에서 빠지며, 다시 실행하면 해당 작업만 다시 제출된다.
+    - 재개한 batch의 결과라도 제출 이후 프롬프트/입력/모델이 바뀌어 요청 key가 달라진 작업은 저널/캐시에
+      기록하지 않고 버리며, 다시 실행하면 현재 요청으로 다시 제출된다.
+    - batch 자체가 실패하면(입력 검증 오류 등) batch.errors를 보여 주고 batches.json을 남겨 둔다.
+      같은 입력을 다시 제출하지 않도록, 원인을 고친 뒤 batches.json을 지워야 다시 제출된다.
+
+    Raises:
+        RuntimeError: 결과 없이 실패한 batch가 있을 때 (다른 batch의 결과는 저널/캐시에 반영된 뒤)
+
+    Args:
+        client (openai.OpenAI): base_url을 지정하면 호환 endpoint(로컬 테스트 서버 등)로 제출
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    client = client.with_options(max_retries=SDK_MAX_RETRIES)
+    cache = resolve_cache(cache)
+    state_file = os.path.join(work_dir, "batches.json")
+
+    inputs = build_batch_inputs(dataset)
+    num_records = len(inputs)
+    jobs = build_jobs(num_records, n_iter)
+    print(f"Total data : {num_records}")
+
+    request_keys = {job: job_request_key(job, inputs, model, temperature) for job in jobs}
+    completed = journal.load_valid(request_keys) if journal else {}
+    journaled = len(completed)
+    pending = []
+    for job in jobs:
+        if job in completed:
+            continue
+        cached = cache.get(request_keys[job]) if cache else None
+        if cached is not None:
+            completed[job] = cached
+        else:
+            pending.append(job)
+    record_cache_hits("chat", model, len(completed) - journaled)
+    print(f"Completed : {len(completed)}, pending : {len(pending)}")
+
+    batches = load_batch_state(state_file)
+    if batches:
+        print(f"Resuming {len(batches)} submitted batch(es)")
+    elif pending:
+        requests = build_batch_requests(pending, inputs, model, temperature)
+        for number, chunk in enumerate(split_requests(requests)):
+            requests_path = os.path.join(work_dir, f"requests_{number:03d}.jsonl")
+            write_records(chunk, requests_path)
+            batch_id = submit_batch(client, requests_path, metadata={"chunk": str(number)})
+            keys = {request["custom_id"]: request_keys[parse_custom_id(request["custom_id"])] for request in chunk}
+            batches.append({"id": batch_id, "requests": requests_path, "keys": keys})
+            # 제출 직후 기록해 두어야 중단되어도 같은 요청을 다시 제출하지 않는다.
+            save_batch_state(batches, state_file)
+            print(f"Submitted batch {batch_id} ({len(chunk)} requests)")
+
+    failed = {}
+    stale = 0
+    rejected = []
+    for entry in batches:
+        batch = wait_for_batch(client, entry["id"], poll_interval=poll_interval, timeout=timeout)
+        if batch.status == "failed" and not batch.output_file_id and not batch.error_file_id:
+            messages = batch_errors(batch) or ["no error details"]
+            print(f"Batch {entry['id']} : failed without results ({len(messages)} error(s))")
+            for message in messages:
+                print(f"  {message}")
+            rejected.append((entry, messages))
+            continue
+
+        responses, errors, usages = read_batch_output(client, batch)
+        submitted_keys = entry.get("keys") or {}
+        for job, response in responses.items():
+            # 제출 이후 요청이 바뀐 작업의 결과를 새 key로 기록하면 캐시/저널이 오염되므로 버린다.
+            if job not in request_keys or submitted_keys.get(job_custom_id(job)) != request_keys[job]:
+                stale += 1
+                continue
+            completed[job] = response
+            _, section, variant, _ = job
+            record_call("batch", model, usage=usages.get(job), batch=True,
+                        prompt_version=VARIANT_PROMPT_VERSIONS[variant], section=section, variant=variant)
+            if journal:
+                journal.append(job, response, request_keys[job])
+            if cache:
+                cache.put(request_keys[job], response)
+        failed.update(errors)
+        print(f"Batch {entry['id']} : {batch.status}, {len(responses)} succeeded, {len(errors)} failed")
+
+    if rejected:
+        save_batch_state([entry for entry, _ in rejected], state_file)
+        details = "; ".join(f"{entry['id']} ({entry['requests']}): {messages[0]}" for entry, messages in rejected)
+        raise RuntimeError(f"{len(rejected)} batch(es) failed without results: {details}. "
+                           f"Fix the input and remove {state_file} to resubmit")
+    if os.path.exists(state_file):
+        os.remove(state_file)
+    if stale:
+        print(f"{stale} response(s) were for requests that changed after submission and were discarded; "
+              f"run again to resubmit them")
+    if failed:
+        print(f"{len(failed)} request(s) failed and are missing from the results; run again to resubmit them")
+
+    return assemble_results(num_records, completed)
+
+
+def main():
+    n_iter = 1
+    temperature = 0
+    # 로컬 테스트 서버 등 호환 endpoint를 쓰려면 OPENAI_BASE_URL 지정 (없으면 OpenAI API)
+    client = openai.OpenAI(api_key=openai_api_key, base_url=os.getenv("OPENAI_BASE_URL"), max_retries=0)
+
+    results = run_batch_inference(iter_records("../data/dev-survey-result.json"), client, n_iter=n_iter,
+                                  temperature=temperature, journal=RunJournal("../result/inference_journal.jsonl"))
+    save_results(results, "../result")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import io
+import hashlib
+import threading
+import pandas as pd
+import streamlit as st
+import matplotlib.pyplot as plt
+
+from collections import OrderedDict
+
+
+class ChartCache:
+    """
+    렌더링된 차트(PNG 바이트, Plotly JSON 등)를 key별로 보관하는 LRU 캐시
+
+    key는 (data hash, column, filters, graph type) 처럼 차트 결과를 결정하는 값들의 tuple을 사용한다.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """key에 해당하는 결과가 없으면 render()를 호출해 저장한 뒤 반환"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = render()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+@st.cache_resource
+def get_chart_cache() -> ChartCache:
+    """세션/rerun 간에 공유되는 차트 캐시"""
+    return ChartCache()
+
+
+def dataframe_hash(df, columns) -> str:
+    """선택한 컬럼들의 내용 해시 (업로드 파일 해시가 없을 때 캐시 key로 사용)"""
+    subset = df[list(columns)]
+    hasher = hashlib.sha1()
+    hasher.update(repr([(column, str(dtype)) for column, dtype in subset.dtypes.items()]).encode("utf-8"))
+    hasher.update(pd.util.hash_pandas_object(subset, index=False).values.tobytes())
+    return hasher.hexdigest()
+
+
+def figure_to_png(fig, dpi=100) -> bytes:
+    """matplotlib figure를 PNG 바이트로 변환하고 figure를 닫는다."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
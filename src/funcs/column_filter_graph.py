@@ -1,37 +1,32 @@
-import seaborn as sns
 import streamlit as st
 import matplotlib.pyplot as plt
 
+from funcs.chart_cache import dataframe_hash, figure_to_png, get_chart_cache
+from utils.kde import DEFAULT_MAX_GROUPS, binned_kde, group_codes
 
-def col_filter_graph(df, selected_column, selected_filters):
-    """
-    주어진 데이터프레임에서 선택된 컬럼(selected_column)과 필터(selected_filters)를 기반으로
-    서브플롯에 각각의 필터를 KDE 그래프로 시각화합니다.
-
-    Parameters:
-    df (pd.DataFrame): 데이터프레임
-    selected_column (str): 그룹화에 사용할 컬럼
-    selected_filters (list): 분석할 필터(숫자형 컬럼)의 리스트
-    """
-    if not selected_filters:
-        st.warning("필터를 하나 이상 선택해야 합니다.")
-        return
 
+def _render_kde_grid(df, selected_column, selected_filters, max_groups) -> bytes:
     # 서브플롯 행과 열 계산
     num_filters = len(selected_filters)
     rows = (num_filters + 2) // 3  # 한 행에 최대 3개의 서브플롯 배치
     cols = min(3, num_filters)
 
     # 큰 플롯 생성
-    fig, axes = plt.subplots(rows, cols, figsize=(15, 5 * rows))
+    fig, axes = plt.subplots(rows, cols, figsize=(15, 5 * rows), squeeze=False)
     axes = axes.flatten()  # axes를 1차원 리스트로 변환하여 인덱싱 가능하게 함
 
+    # 그룹은 한 번만 나누고, 필터마다 모든 그룹의 밀도를 한 번에 계산
+    codes, labels = group_codes(df[selected_column], max_groups=max_groups)
+
     # 각 필터에 대해 서브플롯 생성
     for idx, filter_name in enumerate(selected_filters):
         ax = axes[idx]  # 현재 서브플롯 선택
-        for value in df[selected_column].unique():
-            filtered_data = df[df[selected_column] == value][filter_name]
-            sns.kdeplot(filtered_data, ax=ax, label=f"{value}", fill=True, alpha=0.3)
+        grid, densities = binned_kde(df[filter_name].to_numpy(dtype=float, na_value=float("nan")), codes, len(labels))
+        for label, density in zip(labels, densities):
+            if not (density > 0).any():
+                continue
+            line, = ax.plot(grid, density, label=label)
+            ax.fill_between(grid, density, color=line.get_color(), alpha=0.3)
 
         # 서브플롯 설정
         ax.set_title(f"{selected_column}별 {filter_name}")
@@ -43,7 +38,35 @@ def col_filter_graph(df, selected_column, selected_filters):
     for idx in range(len(selected_filters), len(axes)):
         fig.delaxes(axes[idx])
 
-    # 레이아웃 조정 및 Streamlit에 그래프 출력
     plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    return figure_to_png(fig)
+
+
+def col_filter_graph(df, selected_column, selected_filters, data_key=None, max_groups=DEFAULT_MAX_GROUPS):
+    """
+    주어진 데이터프레임에서 선택된 컬럼(selected_column)과 필터(selected_filters)를 기반으로
+    서브플롯에 각각의 필터를 KDE 그래프로 시각화합니다.
+
+    KDE는 그룹별 boolean mask 대신 binning + FFT convolution으로 모든 그룹을 한 번에 계산하며,
+    그룹이 max_groups개를 넘으면 빈도 상위 그룹 외에는 "기타"로 묶어 그립니다.
+    렌더링 결과는 (data_key, column, filters) 단위로 캐시됩니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임
+    selected_column (str): 그룹화에 사용할 컬럼
+    selected_filters (list): 분석할 필터(숫자형 컬럼)의 리스트
+    data_key (str): 데이터 내용 해시 (업로드 파일 해시). 없으면 사용하는 컬럼 내용으로 계산
+    max_groups (int): 그래프에 그릴 최대 그룹 수 ("기타" 포함)
+    """
+    if not selected_filters:
+        st.warning("필터를 하나 이상 선택해야 합니다.")
+        return
+
+    selected_filters = tuple(selected_filters)
+    data_key = data_key or dataframe_hash(df, (selected_column,) + selected_filters)
+
+    key = ("col_filter", data_key, selected_column, selected_filters, "kde", max_groups)
+    png = get_chart_cache().get_or_render(
+        key, lambda: _render_kde_grid(df, selected_column, selected_filters, max_groups)
+    )
+    st.image(png)
@@ -1,34 +1,101 @@
-import seaborn as sns
+import numpy as np
+import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
+import plotly.io as pio
+import plotly.graph_objects as go
 
-def single_col_visualize(df, selected_column, selected_graph):
+from funcs.chart_cache import dataframe_hash, get_chart_cache
+
+DEFAULT_TOP_K = 30
+DEFAULT_BINS = 20
+OTHER_LABEL = "기타"
+
+
+def count_summary(values, top_k=DEFAULT_TOP_K, bins=DEFAULT_BINS, other_label=OTHER_LABEL) -> pd.Series:
+    """
+    막대 그래프용 값 분포 요약 (label -> count)
+
+    - 실수형은 소수점 둘째 자리로 반올림한 값 기준으로 세고, 고유값이 top_k개를 넘으면 bins개의 등간격 구간으로 묶는다.
+    - 정수형은 고유값이 top_k개를 넘으면 같은 개수의 정수를 담는 최대 bins개의 "a–b" 구간으로 묶는다.
+    - 그 외 컬럼은 고유값이 top_k개를 넘으면 빈도 상위 top_k - 1개 외에는 other_label로 합친다.
+    - 숫자형은 값 순서, 그 외는 등장 순서로 정렬 (seaborn countplot과 동일), NaN은 제외
+    """
+    if pd.api.types.is_float_dtype(values):
+        values = values.round(2)
+
+    counts = values.value_counts(sort=False)
+    numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+    if numeric:
+        counts = counts.sort_index()
+        if len(counts) > top_k:
+            points = counts.index.to_numpy(dtype=float)
+            if pd.api.types.is_integer_dtype(values):
+                # 구간마다 같은 개수의 정수가 들어가도록 정수 간격으로 나누고 "a–b"(양끝 포함)로 표시
+                low, high = int(points.min()), int(points.max())
+                step = -(-(high - low + 1) // bins)
+                edges = np.arange(low, high + step + 1, step)
+                labels = [f"{start}–{min(end - 1, high)}" if step > 1 else f"{start}"
+                          for start, end in zip(edges[:-1], edges[1:])]
+            else:
+                edges = np.histogram_bin_edges(points, bins=bins)
+                labels = [f"[{start:g}, {end:g})" for start, end in zip(edges[:-1], edges[1:])]
+                labels[-1] = labels[-1][:-1] + "]"
+            binned, _ = np.histogram(points, bins=edges, weights=counts.to_numpy())
+            return pd.Series(binned.astype(np.int64), index=labels, name="count")
+    elif len(counts) > top_k:
+        keep = counts.nlargest(top_k - 1, keep="first").index
+        kept = counts[counts.index.isin(keep)]
+        other = pd.Series([counts.sum() - kept.sum()], index=[other_label])
+        counts = pd.concat([kept, other])
+
+    counts.index = counts.index.map(str)
+    return counts.rename("count")
+
+
+def _bar_colors(n):
+    # seaborn countplot(hue=컬럼)처럼 막대마다 다른 색을 순환 사용
+    palette = pio.templates[pio.templates.default].layout.colorway or ["#636efa"]
+    return [palette[i % len(palette)] for i in range(n)]
+
+
+def _render_count_chart(counts, selected_column) -> str:
+    fig = go.Figure(go.Bar(x=counts.index.tolist(), y=counts.to_numpy(), marker_color=_bar_colors(len(counts))))
+    fig.update_layout(
+        title=f"{selected_column} 값 분포",
+        xaxis_title=selected_column,
+        yaxis_title="count",
+        xaxis=dict(type="category", tickangle=-90),
+        height=300,
+        margin=dict(l=20, r=20, t=40, b=20),
+        showlegend=False
+    )
+    return fig.to_json()
+
+
+def single_col_visualize(df, selected_column, selected_graph, data_key=None, top_k=DEFAULT_TOP_K, bins=DEFAULT_BINS):
     """
     선택한 컬럼을 기반으로 시각화하는 함수
+
+    원본 행 대신 value_counts 요약(count_summary)으로 그리므로 그래프 비용이 행 수와 무관하며,
+    렌더링 결과(Plotly JSON)는 (data_key, column, graph type) 단위로 캐시되어 같은 선택으로 rerun될 때는
+    다시 집계하지 않는다.
+
+    Args:
+        data_key (str): 데이터 내용 해시 (업로드 파일 해시). 없으면 선택된 컬럼 내용으로 계산
+        top_k (int): 그릴 최대 막대 수
+        bins (int): 고유값이 많은 숫자형 컬럼을 묶을 구간 수
     """
-    # 선택된 컬럼의 데이터가 실수형인지 확인
-    if df[selected_column].dtype in ['float64', 'float32']:
-        # 소수점 둘째 자리까지 반올림
-        df[selected_column] = df[selected_column].round(2)
-
-    # 고유값 추출 (반올림 후)
-    unique_values = df[selected_column].unique()
-    
-    # 막대 그래프 선택
-    if selected_graph == 'bar':
-        fig = plt.figure(figsize=(12, 3))
-        ax = plt.axes()
-        
-        # hue를 사용하고 legend 제외
-        sns.countplot(data=df,
-                     x=selected_column,
-                     hue=selected_column,
-                     legend=False)
-        
-        plt.xticks(rotation=90)
-        plt.title(f"{selected_column} 값 분포")
-        plt.tight_layout()
-        st.pyplot(fig, use_container_width=True)
-        
-    else:
+    if selected_graph != 'bar':
         st.error("지원되지 않는 그래프 타입입니다.")
+        return
+
+    data_key = data_key or dataframe_hash(df, [selected_column])
+
+    def render():
+        # 캐시된 DataFrame을 공유하므로 원본을 수정하지 않고 요약만 계산
+        counts = count_summary(df[selected_column], top_k=top_k, bins=bins)
+        return _render_count_chart(counts, selected_column)
+
+    key = ("single_col", data_key, selected_column, selected_graph, top_k, bins)
+    fig = pio.from_json(get_chart_cache().get_or_render(key, render))
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,8 +1,15 @@
 import os
 import uuid
-import psycopg2
-import requests
 import json
+import random
+import hashlib
+import asyncio
+import aiohttp
+import requests
+
+from psycopg2.pool import ThreadedConnectionPool
+
+from utils.dataset_io import append_record, iter_records, write_records
 
 from dotenv import load_dotenv
 load_dotenv('./keys.env')
@@ -22,6 +29,19 @@ db_config = {
 }
 print(db_config)
 
+API_BASE_URL = "https://dev-api.grabberhr.com/api/v2/public/tests/{testId}/ai-request"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_connection_pool = None
+
+
+def get_connection_pool(minconn=1, maxconn=4):
+    """프로세스 전체에서 재사용하는 DB 커넥션 풀"""
+    global _connection_pool
+    if _connection_pool is None:
+        _connection_pool = ThreadedConnectionPool(minconn, maxconn, **db_config)
+    return _connection_pool
+
 # UUID 유효성 검사 함수
 def is_valid_uuid(value):
     try:
@@ -31,36 +51,44 @@ def is_valid_uuid(value):
         return False
 
 # 데이터베이스에서 ID 가져오기
-def fetch_ids(query):
+def fetch_ids(query, pool=None):
+    """
+    Args:
+        pool: getconn()/putconn()을 제공하는 커넥션 풀 (None이면 기본 psycopg2 풀).
+              로컬 Postgres나 SQLite 커넥션을 감싼 객체로 대체할 수 있다.
+    """
+    pool = pool or get_connection_pool()
+    connection = None
     try:
-        connection = psycopg2.connect(**db_config)
+        connection = pool.getconn()
         cursor = connection.cursor()
         cursor.execute(query)  # SQL 쿼리 실행
         ids = cursor.fetchall()  # 결과 가져오기
+        cursor.close()
         return [row[0] for row in ids if is_valid_uuid(row[0])]  # UUID만 반환
     except Exception as e:
         print(f"Error fetching data: {e}")
         return []
     finally:
-        if 'connection' in locals() and connection:
-            cursor.close()
-            connection.close()
+        if connection is not None:
+            pool.putconn(connection)
 
 # REST API 호출 및 결과 저장
 def send_request_to_api(id_list, output_file):
-    base_url = "https://dev-api.grabberhr.com/api/v2/public/tests/{testId}/ai-request"
+    base_url = API_BASE_URL
     headers = {
         'accept': '*/*',
         'Authorization': f'Bearer {JWT}'
     }
 
     all_responses = []  # 응답 데이터를 저장할 리스트
+    session = requests.Session()  # keep-alive 연결 재사용
 
     for id_value in id_list:
         print(id_value)
         url = base_url.format(testId=id_value)  # ID를 URL에 삽입
         try:
-            response = requests.get(url, headers=headers)  # GET 요청
+            response = session.get(url, headers=headers)  # GET 요청
             if response.status_code == 200:
                 try:
                     data = response.json()  # JSON 파싱
@@ -82,6 +110,251 @@ def send_request_to_api(id_list, output_file):
         print(f"Error saving responses to file: {e}")
 
 
+def load_fetched_ids(stream_file):
+    """이미 스트리밍 파일에 기록된 testId 집합 (재실행 시 중복 요청 방지)"""
+    fetched = set()
+    if os.path.exists(stream_file):
+        with open(stream_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    fetched.add(json.loads(line)["testId"])
+                except (ValueError, KeyError):
+                    continue
+    return fetched
+
+
+async def fetch_one(session, semaphore, id_value, base_url, max_attempts):
+    """단일 testId 결과 조회. 429/5xx와 네트워크 오류는 지수 백오프 + jitter로 재시도"""
+    url = base_url.format(testId=id_value)
+    for attempt in range(max_attempts):
+        try:
+            async with semaphore:
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        try:
+                            return await response.json(content_type=None)
+                        except ValueError:
+                            print(f"Success: ID {id_value} processed, but response is not valid JSON.")
+                            return None
+                    if response.status not in RETRYABLE_STATUS:
+                        print(f"Failed for ID {id_value}: {response.status}, {await response.text()}")
+                        return None
+                    retry_after = response.headers.get("retry-after")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error sending request for ID {id_value}: {e}")
+            retry_after = None
+
+        if attempt < max_attempts - 1:
+            if retry_after and retry_after.isdigit():
+                # 서버가 지정한 시간보다 일찍 재시도하지 않는다.
+                delay = float(retry_after) + random.uniform(0, 1)
+            else:
+                backoff = min(30, 2 ** attempt)
+                delay = random.uniform(backoff / 2, backoff)
+            await asyncio.sleep(delay)
+
+    print(f"Giving up on ID {id_value} after {max_attempts} attempts.")
+    return None
+
+
+async def fetch_results_async(id_list, stream_file, base_url=API_BASE_URL, max_concurrency=16, max_attempts=5,
+                              timeout=30):
+    """
+    keep-alive 세션을 공유하며 최대 max_concurrency개씩 동시에 결과를 조회하고,
+    도착하는 즉시 {"testId", "result"} 한 줄씩 stream_file(JSONL)에 기록한다.
+    이미 기록된 testId는 다시 요청하지 않는다.
+
+    Returns:
+        int: 이번 실행에서 새로 기록한 결과 수
+    """
+    fetched = load_fetched_ids(stream_file)
+    pending = [id_value for id_value in id_list if id_value not in fetched]
+    print(f"Already fetched: {len(fetched)}, pending: {len(pending)}")
+
+    headers = {
+        'accept': '*/*',
+        'Authorization': f'Bearer {JWT}'
+    }
+    connector = aiohttp.TCPConnector(limit=max_concurrency, keepalive_timeout=60)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    written = 0
+    async with aiohttp.ClientSession(headers=headers, connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+
+        async def run(id_value):
+            return id_value, await fetch_one(session, semaphore, id_value, base_url, max_attempts)
+
+        for future in asyncio.as_completed([run(id_value) for id_value in pending]):
+            id_value, data = await future
+            if data is None:
+                continue
+            append_record(stream_file, {"testId": id_value, "result": data})
+            written += 1
+            print(f"Success: ID {id_value} processed.")
+
+    return written
+
+
+def finalize_results(id_list, stream_file, output_file):
+    """
+    스트리밍 파일의 결과를 id_list 순서로 저장
+    (.json이면 기존 dev-survey-result.json 배열 형식, .jsonl(.zst)이면 줄 단위 데이터셋)
+    """
+    results = {}
+    for entry in iter_records(stream_file):
+        results[entry["testId"]] = entry["result"]
+
+    ordered = [results[id_value] for id_value in id_list if id_value in results]
+    write_records(ordered, output_file)
+    print(f"{len(ordered)} responses saved to {output_file}.")
+
+
+def iter_id_rows(query, pool=None, page_size=1000, cursor_name="sync_id_cursor"):
+    """
+    named(server-side) cursor로 쿼리 결과를 page_size개씩 가져오는 generator
+
+    psycopg2가 아닌 커넥션(SQLite 등)은 named cursor를 지원하지 않으므로 일반 cursor의 fetchmany로 대체한다.
+    """
+    pool = pool or get_connection_pool()
+    connection = pool.getconn()
+    try:
+        try:
+            cursor = connection.cursor(name=cursor_name)
+            cursor.itersize = page_size
+        except TypeError:
+            cursor = connection.cursor()
+
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            for row in rows:
+                if is_valid_uuid(row[0]):
+                    yield row
+        cursor.close()
+        connection.commit()  # named cursor의 트랜잭션 종료
+    finally:
+        pool.putconn(connection)
+
+
+def content_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def load_sync_state(state_file):
+    """{testId: {"index", "updated_at", "content_hash"}} 형태의 로컬 watermark"""
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_sync_state(state, state_file):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+def sync_results(where_clause, output_file, state_file, updated_at_column=None, pool=None, **fetch_kwargs):
+    """
+    새로 생기거나 변경된 테스트만 API로 조회하여 output_file(JSON 배열)을 갱신
+
+    - id 목록은 server-side cursor로 페이지 단위 조회 (fetchall 없음)
+    - state_file에 id별 dataset 위치, updated_at, 결과 content hash를 기록
+    - updated_at_column이 주어지면 값이 바뀐 id도 다시 조회하고, 없으면 새 id만 조회
+    - 변경된 결과는 기존 위치를 덮어쓰고, 새 결과는 쿼리(id) 순서대로 뒤에 추가하여 기존 인덱스를 유지
+    - state 없이 output_file만 있으면 전체를 조회한 뒤 결과 content hash가 같은 기존 레코드의 위치를
+      그대로 물려받아 state를 만든다. (기존 *_output.json / 저널의 레코드 인덱스가 밀리지 않음)
+
+    Raises:
+        RuntimeError: state와 output_file의 레코드 수가 맞지 않을 때
+    """
+    columns = f"id, {updated_at_column}" if updated_at_column else "id"
+    query = f"SELECT {columns} FROM hr_culture_test WHERE {where_clause} ORDER BY id"
+
+    state = load_sync_state(state_file)
+    to_fetch = {}
+    for row in iter_id_rows(query, pool=pool):
+        id_value = str(row[0])
+        updated_at = str(row[1]) if updated_at_column and row[1] is not None else None
+        known = state.get(id_value)
+        if known is None or (updated_at is not None and known.get("updated_at") != updated_at):
+            to_fetch[id_value] = updated_at
+    print(f"Known tests: {len(state)}, new or changed: {len(to_fetch)}")
+
+    if not to_fetch:
+        return 0
+
+    dataset = list(iter_records(output_file)) if os.path.exists(output_file) else []
+    if state:
+        expected = max(known["index"] for known in state.values()) + 1
+        if len(dataset) != expected:
+            raise RuntimeError(f"{state_file} tracks {expected} records but {output_file} has {len(dataset)}; "
+                               f"restore {output_file} or remove {state_file} to rebuild the state from it")
+
+    # state가 없으면 기존 레코드를 content hash로 id에 대응시켜 위치를 유지한다.
+    unclaimed = {}
+    seeding = not state and bool(dataset)
+    if seeding:
+        for index, data in enumerate(dataset):
+            unclaimed.setdefault(content_hash(data), []).append(index)
+        print(f"Seeding sync state from {len(dataset)} existing records in {output_file}")
+
+    # 이번 동기화 전용 스트림 파일 (변경된 id가 이전 기록 때문에 건너뛰어지지 않도록 새로 만든다)
+    stream_file = output_file + ".sync.jsonl"
+    for path in (stream_file, stream_file + ".idx"):
+        if os.path.exists(path):
+            os.remove(path)
+    asyncio.run(fetch_results_async(list(to_fetch), stream_file, **fetch_kwargs))
+
+    if not os.path.exists(stream_file):
+        print("No responses fetched.")
+        return 0
+
+    # 스트림 파일은 응답 도착 순서이므로 쿼리(id) 순서로 정렬해 새 레코드의 인덱스가 네트워크 상황에 좌우되지 않게 한다.
+    query_order = {id_value: position for position, id_value in enumerate(to_fetch)}
+    entries = sorted(iter_records(stream_file), key=lambda entry: query_order[entry["testId"]])
+    if seeding and len(entries) < len(to_fetch):
+        # 일부만 받은 상태로 state를 만들면 못 받은 id의 기존 레코드가 나중에 중복 추가된다.
+        print(f"Seeding aborted: {len(to_fetch) - len(entries)} tests could not be fetched; run again")
+        return 0
+
+    changed = 0
+    for entry in entries:
+        id_value, data = entry["testId"], entry["result"]
+        digest = content_hash(data)
+        known = state.get(id_value)
+
+        if known is None and unclaimed.get(digest):
+            state[id_value] = {"index": unclaimed[digest].pop(0), "updated_at": to_fetch[id_value],
+                               "content_hash": digest}
+        elif known is None:
+            state[id_value] = {"index": len(dataset), "updated_at": to_fetch[id_value], "content_hash": digest}
+            dataset.append(data)
+            changed += 1
+        else:
+            known["updated_at"] = to_fetch[id_value]
+            if known["content_hash"] != digest:
+                dataset[known["index"]] = data
+                known["content_hash"] = digest
+                changed += 1
+
+    orphaned = sum(len(indices) for indices in unclaimed.values())
+    if orphaned:
+        print(f"{orphaned} existing records in {output_file} matched no current test; "
+              f"they keep their positions but are no longer synced")
+
+    write_records(dataset, output_file)
+    save_sync_state(state, state_file)
+    os.remove(stream_file)
+    os.remove(stream_file + ".idx")
+    print(f"{changed} new or changed responses merged into {output_file}.")
+    return changed
+
+
 def main():
     # 첫 번째 쿼리 실행
     query1 = """
@@ -95,6 +368,14 @@ def main():
     # send_request_to_api([test])
     # send_request_to_api(ids_with_auth_code)
 
+    # 증분 동기화: 이미 받은 테스트는 건너뛰고 새로 생기거나 변경된 테스트만 조회
+    incremental = True
+    if incremental:
+        sync_results("auth_code IS NOT NULL AND enabled = FALSE",
+                     "../data/dev-survey-result.json",
+                     "../data/dev-survey-result.sync_state.json")
+        return
+
     # 두 번째 쿼리 실행
     query2 = """
     SELECT id
@@ -105,8 +386,10 @@ def main():
     ids_with_auth_code_disabled = fetch_ids(query2)
     print(f"Fetched valid UUIDs with auth_code and disabled: {len(ids_with_auth_code_disabled)}")
 
-    # API 호출 및 결과 저장
-    send_request_to_api(ids_with_auth_code_disabled, "../data/dev-survey-result.json")
+    # API 호출 결과를 도착 순서대로 JSONL에 기록한 뒤 기존 JSON 형식으로 정리
+    stream_file = "../data/dev-survey-result.stream.jsonl"
+    asyncio.run(fetch_results_async(ids_with_auth_code_disabled, stream_file))
+    finalize_results(ids_with_auth_code_disabled, stream_file, "../data/dev-survey-result.json")
 
 
 if __name__ == "__main__":
@@ -3,10 +3,15 @@ import json
 import openai
 import streamlit as st
 
-from utils.file import load_json, save_to_json_file
+from utils.journal import RunJournal
+from utils.file import save_to_json_file
+from utils.dataset_io import iter_records, append_records
 from processors.cot_prompt_processor import prompt_input_processing, run_openai_api
 from processors.data_processor import translate_and_convert_to_string, process_vision_result, extract_workstyle_info
 from utils.calculates import create_results_dataframe, analyze_responses, visualize_results, analyze_unique_responses
+from utils.llm_metrics import metric_labels
+from funcs.async_inference import VARIANT_PROMPT_VERSIONS, request_key
+from funcs.batch_inference import run_batch_inference, save_results
 
 from processors.prompt_processor import vision_prompt, workstyle_prompt, summary_prompt
 from processors.cot_prompt_processor import (vision_prompt as cot_vision_prompt, 
@@ -18,17 +23,55 @@ from dotenv import load_dotenv
 load_dotenv('/home/pervinco/LLM-tutorials/keys.env')
 openai_api_key = os.getenv('GRAVY_LAB_OPENAI')
 
+SAMPLE_METADATA_PATH = "../result/sample_metadata.jsonl"
+
+def run_section(client, journal, completed, idx, section, variant, n_iter, prompt, input, temperature,
+                model="gpt-4o"):
+    """
+    저널에 이미 모든 iteration이 있으면 재사용하고, 아니면 요청 후 즉시 저널에 기록
+
+    prompt나 입력이 바뀌어 저널의 요청 key와 다르면 다시 요청한다.
+    """
+    keys = {(idx, section, variant, i + 1): request_key(model, prompt, input, temperature, i + 1)
+            for i in range(n_iter)}
+    if all(completed.get(job, (None,))[0] == key for job, key in keys.items()):
+        return [{"iteration": job[3], "response": completed[job][1]} for job in keys]
+
+    sample_log = []
+    with metric_labels(prompt_version=VARIANT_PROMPT_VERSIONS[variant], section=section, variant=variant):
+        results = run_openai_api(client, n_iter, prompt, input, temperature, model=model, sample_log=sample_log)
+    for result in results:
+        job = (idx, section, variant, result["iteration"])
+        journal.append(job, result["response"], keys[job])
+    # 새로 생성한 choice별 finish_reason / 요청 단위 usage(요청별 첫 choice에만) 기록
+    append_records(SAMPLE_METADATA_PATH,
+                   [{"idx": idx, "section": section, "variant": variant, **entry} for entry in sample_log])
+    return results
+
+
 def main():
     n_iter = 1
     temperature = 0
-    client = openai.OpenAI(api_key=openai_api_key)
-    dataset = load_json("../data/dev-survey-result.json")
-    print(f"Total data : {len(dataset)}")
+    # 지연 시간이 중요하지 않은 전체 재생성은 Batch API로 제출 (OPENAI_BASE_URL로 호환 endpoint 지정 가능)
+    batch_mode = False
+    client = openai.OpenAI(api_key=openai_api_key, base_url=os.getenv("OPENAI_BASE_URL"), max_retries=0)
+    dataset_path = "../data/dev-survey-result.json"
+
+    # 중단된 실행은 저널에 기록된 결과부터 이어서 진행
+    journal = RunJournal("../result/inference_journal.jsonl")
+    if batch_mode:
+        results = run_batch_inference(iter_records(dataset_path), client, n_iter=n_iter, temperature=temperature,
+                                      journal=journal)
+        save_results(results, "../result")
+        return
+
+    completed = journal.load()
+    print(f"Journaled results : {len(completed)}")
 
     vision_results = []
     workstyle_results = []
     summary_results = []
-    for idx, hr_data_dict in enumerate(dataset):
+    for idx, hr_data_dict in enumerate(iter_records(dataset_path)):
         vision_data = process_vision_result(hr_data_dict['visionResult'], hr_data_dict['summaryResult'])
         workstyle_data = extract_workstyle_info(hr_data_dict['workstyleResult'], hr_data_dict['summaryResult'])
         vision_input, workstyle_input, summary_input = prompt_input_processing(hr_data_dict, vision_data, workstyle_data)
@@ -39,15 +82,20 @@ def main():
         print(f"Workstyle input\n", workstyle_input)
         print(f"Summary input\n", summary_input)
 
-        vision_results.append({"original" : run_openai_api(client, n_iter, vision_prompt, vision_input, temperature),
-                               "advanced" : run_openai_api(client, n_iter, cot_vision_prompt, vision_input, temperature)})
+        run = lambda section, variant, prompt, input: run_section(client, journal, completed, idx, section, variant,
+                                                                  n_iter, prompt, input, temperature)
+
+        vision_results.append({"original" : run("vision", "original", vision_prompt, vision_input),
+                               "advanced" : run("vision", "advanced", cot_vision_prompt, vision_input)})
 
-        workstyle_results.append({"original" : run_openai_api(client, n_iter, workstyle_prompt, workstyle_input, temperature),
-                                  "advanced" : run_openai_api(client, n_iter, cot_workstyle_prompt, workstyle_input, temperature)})
+        workstyle_results.append({"original" : run("workstyle", "original", workstyle_prompt, workstyle_input),
+                                  "advanced" : run("workstyle", "advanced", cot_workstyle_prompt, workstyle_input)})
         
-        summary_results.append({"original" : run_openai_api(client, n_iter, summary_prompt, summary_input, temperature),
-                                "advanced" : run_openai_api(client, n_iter, cot_summary_prompt, summary_input, temperature)})
+        summary_results.append({"original" : run("summary", "original", summary_prompt, summary_input),
+                                "advanced" : run("summary", "advanced", cot_summary_prompt, summary_input)})
         
+    # 파일을 한 번만 읽도록 개수는 순회하면서 센다.
+    print(f"Total data : {len(vision_results)}")
     save_to_json_file(vision_results, "../result/vision_output.json")
     save_to_json_file(workstyle_results, "../result/workstyle_output.json")
     save_to_json_file(summary_results, "../result/summary_output.json")
@@ -6,7 +6,7 @@ import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 from matplotlib import font_manager, rc
 
-from utils.file import load_data
+from utils.data_cache import get_dataframe, column_describe, column_value_counts, grouped_mean_std
 from utils.font import get_font_path
 from funcs.column_only_graph import single_col_visualize
 from funcs.column_filter_graph import col_filter_graph
@@ -26,8 +26,8 @@ def main():
     st.set_page_config(page_title="EDA Dashboard", layout="wide")
     st.sidebar.title("Options")
 
-    uploaded_file = st.sidebar.file_uploader("Upload File", type=['csv', 'xlsx'])
-    df = load_data(uploaded_file)
+    uploaded_file = st.sidebar.file_uploader("Upload File", type=['csv', 'xlsx', 'parquet', 'json', 'jsonl'])
+    df, data_key = get_dataframe(uploaded_file)
 
     if df is not None:
         columns = df.columns.tolist()
@@ -50,27 +50,26 @@ def main():
 
         with col1:
             st.markdown("##### 기본 통계")
-            st.write(df[selected_column].describe())
+            st.write(column_describe(data_key, selected_column, df))
 
         with col2:
             st.markdown("##### 고유값 분포")
-            value_counts = df[selected_column].value_counts()
+            value_counts = column_value_counts(data_key, selected_column, df)
             st.write(value_counts)
 
         with col3:
             st.markdown("##### 그래프")
-            single_col_visualize(df, selected_column, selected_graph)
+            single_col_visualize(df, selected_column, selected_graph, data_key=data_key)
 
         if selected_filters:          
             st.subheader(f"[{selected_column}] & {selected_filters} EDA")
 
             st.markdown("#### 평균, 표준편차 표")
-            grouped_stats = df.groupby(selected_column)[selected_filters].agg(['mean', 'std']).reset_index()
-            grouped_stats.columns = [f"{col[0]}_{col[1]}" if col[1] else col[0] for col in grouped_stats.columns]
+            grouped_stats = grouped_mean_std(data_key, selected_column, tuple(selected_filters), df)
             st.write(grouped_stats)
 
             st.markdown("#### 그래프")
-            col_filter_graph(df, selected_column, selected_filters)
+            col_filter_graph(df, selected_column, selected_filters, data_key=data_key)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,16 @@
+import contextvars
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.llm_metrics import record_cache_hits
+from utils.completion_cache import CompletionCache, resolve_cache
+from processors.rate_limiter import get_rate_limiter
+from processors.prompt_templates import PromptTemplate
+
+# n 파라미터로 한 요청에서 받을 최대 choice 수
+MAX_CHOICES_PER_REQUEST = 8
+# choice가 요청한 수보다 적게 올 때 모자란 만큼 다시 요청하는 최대 횟수
+MAX_SHORTFALL_ATTEMPTS = 3
 
 vision_prompt = """
 [목표]
@@ -123,50 +135,146 @@ summary_prompt = """
 - 예제3: "피검사자는 기업의 비전과 가치관에 매우 부합하며, 타 팀 및 구성원과의 원만한 협업과 상급자와의 원활한 소통이 기대됩니다. 그러나 모사형, 오만형, 과몰입형 성향이 높아 조직 내 파벌 형성, 신뢰 저하, 융통성 부족 등의 문제가 발생할 수 있습니다. 갈등 유발 요인을 확인하는 것이 중요합니다. 입사 후 적응 기간은 보통이며, 조기 퇴사 가능성은 낮습니다."
 """
 
-def prompt_input_processing(hr_data_dict, vision_data, workstyle_data):
-    vision_input = f"""
-    company_top_visions: {vision_data['company_top_keywords']}
-    compnay_remain_visions : {vision_data['company_remaining_keywords']}
-    compute_top_visions: {vision_data['compute_top_keywords']}
-    compute_remain_visions : {vision_data['compute_remaining_keywords']}
-    compute_vision_total_evaluation : {vision_data['compute_vision_total_evalation']}
+# user 입력은 기존 f-string과 byte 단위로 같게 유지한다. (completion 캐시 key 호환)
+VISION_TEMPLATE = PromptTemplate(
+    "vision", "cot",
+    system=vision_prompt,
+    user="""
+    company_top_visions: {company_top_keywords}
+    compnay_remain_visions : {company_remaining_keywords}
+    compute_top_visions: {compute_top_keywords}
+    compute_remain_visions : {compute_remaining_keywords}
+    compute_vision_total_evaluation : {compute_vision_total_evalation}
     """
-
-    workstyle_input = f"""
-    company_keywords : {workstyle_data['company_keywords']}
-    compute_keywords : {workstyle_data['compute_keywords']}
-    workstyle_company_total_score : {workstyle_data['workstyle_company_total_score']}
-    workstyle_compute_total_score : {workstyle_data['workstyle_compute_total_score']}
-    workstyle_compute_total_score : {workstyle_data['workstyle_match_percentage']}
-    comparison_ratio: {workstyle_data['comparison_ratio']}
-    compute_workstyle_total_evaluation : {workstyle_data['compute_workstyle_total_evalation']}
+)
+
+WORKSTYLE_TEMPLATE = PromptTemplate(
+    "workstyle", "cot",
+    system=workstyle_prompt,
+    user="""
+    company_keywords : {company_keywords}
+    compute_keywords : {compute_keywords}
+    workstyle_company_total_score : {workstyle_company_total_score}
+    workstyle_compute_total_score : {workstyle_compute_total_score}
+    workstyle_compute_total_score : {workstyle_match_percentage}
+    comparison_ratio: {comparison_ratio}
+    compute_workstyle_total_evaluation : {compute_workstyle_total_evalation}
     """
-
-    summary_input = f"""
-    additionalInformation : {hr_data_dict['summaryResult']['additionalInformation']}
-    recruitentQuestions : {hr_data_dict['summaryResult']['recruitentQuestions']}
-    turnOVerFactors : {hr_data_dict['summaryResult']['turnOverFactors']}
-    fued :{hr_data_dict['summaryResult']['fued']}
+)
+
+SUMMARY_TEMPLATE = PromptTemplate(
+    "summary", "cot",
+    system=summary_prompt,
+    user="""
+    additionalInformation : {additionalInformation}
+    recruitentQuestions : {recruitentQuestions}
+    turnOVerFactors : {turnOverFactors}
+    fued :{fued}
     """
+)
+
+
+def prompt_input_processing(hr_data_dict, vision_data, workstyle_data):
+    vision_input = VISION_TEMPLATE.render(vision_data)
+    workstyle_input = WORKSTYLE_TEMPLATE.render(workstyle_data)
+    summary_input = SUMMARY_TEMPLATE.render(hr_data_dict['summaryResult'])
 
     return vision_input, workstyle_input, summary_input
 
 
-def run_openai_api(client, n_iter, prompt, input, temperature):
-    results = []
-    # for i in range(n_iter):
-    for i in tqdm(range(n_iter)):
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": input}
-            ],
-            temperature=temperature
+def _sample_choices(limiter, client, model, messages, temperature, iterations) -> list:
+    """
+    한 번의 요청으로 len(iterations)개의 choice를 받아 iteration 순서대로 대응
+
+    choice가 요청한 수보다 적게 오면 모자란 iteration만 다시 요청하고,
+    MAX_SHORTFALL_ATTEMPTS번 안에 채우지 못하면 RuntimeError를 발생시킨다.
+    usage는 요청 단위이므로 요청별 첫 번째 choice에만 기록하고 나머지는 0으로 둔다. (합계가 중복 집계되지 않음)
+    """
+    entries = []
+    remaining = list(iterations)
+    for _ in range(MAX_SHORTFALL_ATTEMPTS):
+        kwargs = {"n": len(remaining)} if len(remaining) > 1 else {}
+        completion = limiter.call(
+            client.chat.completions.with_raw_response.create,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **kwargs
         )
-        response_content = completion.choices[0].message.content
-        results.append({
-            "iteration": i + 1,
-            "response": response_content
-        })
-    return results
\ No newline at end of file
+        usage = completion.usage
+        choices = sorted(completion.choices, key=lambda choice: choice.index)[:len(remaining)]
+        for position, (iteration, choice) in enumerate(zip(remaining, choices)):
+            first = position == 0
+            entries.append({
+                "iteration": iteration,
+                "response": choice.message.content,
+                "finish_reason": choice.finish_reason,
+                "request_choices": len(remaining),
+                "prompt_tokens": getattr(usage, "prompt_tokens", None) if first else 0,
+                "completion_tokens": getattr(usage, "completion_tokens", None) if first else 0,
+            })
+        remaining = remaining[len(choices):]
+        if not remaining:
+            return entries
+
+    raise RuntimeError(f"{model} returned too few choices: {len(remaining)} of {len(iterations)} iterations "
+                       f"still missing after {MAX_SHORTFALL_ATTEMPTS} requests")
+
+
+def run_openai_api(client, n_iter, prompt, input, temperature, model="gpt-4o", cache=None,
+                   max_choices=MAX_CHOICES_PER_REQUEST, max_workers=4, sample_log=None):
+    """
+    같은 입력에 대해 n_iter개의 응답을 샘플링하여 [{"iteration", "response"}] 반환
+
+    iteration마다 요청을 보내는 대신 n 파라미터로 요청당 최대 max_choices개의 choice를 받고,
+    나눈 요청들은 max_workers개 스레드로 동시에 보낸다. (system prompt 전송 횟수가 1/max_choices로 줄어듦)
+    캐시는 iteration 단위로 유지되므로 캐시에 없는 iteration만 요청한다.
+
+    Args:
+        max_choices (int): 요청당 choice 수. n을 지원하지 않는 endpoint에서는 1
+        sample_log (list): 지정하면 새로 생성한 choice별 메타데이터
+            {"iteration", "finish_reason", "request_choices", "prompt_tokens", "completion_tokens"}를 추가
+            (토큰 수는 요청별 첫 choice에만 기록되므로 합계가 요청 usage의 합과 같다)
+    """
+    cache = resolve_cache(cache)
+    limiter = get_rate_limiter(model)
+    messages = [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": input}
+    ]
+
+    # 동일 요청이라도 반복 샘플링마다 다른 응답이 필요하므로 iteration을 key에 포함
+    cache_keys = {
+        iteration: CompletionCache.make_key(model=model, messages=messages, temperature=temperature, iteration=iteration)
+        for iteration in range(1, n_iter + 1)
+    }
+    responses = {}
+    if cache:
+        for iteration, cache_key in cache_keys.items():
+            cached = cache.get(cache_key)
+            if cached is not None:
+                responses[iteration] = cached
+        record_cache_hits("chat", model, len(responses))
+
+    missing = [iteration for iteration in cache_keys if iteration not in responses]
+    max_choices = max(1, max_choices)
+    chunks = [missing[start:start + max_choices] for start in range(0, len(missing), max_choices)]
+    if chunks:
+        # metric_labels() 라벨이 worker 스레드의 호출 기록에도 붙도록 요청마다 context를 복사해서 실행
+        contexts = [contextvars.copy_context() for _ in chunks]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            samples = executor.map(
+                lambda context, iterations: context.run(_sample_choices, limiter, client, model, messages,
+                                                        temperature, iterations),
+                contexts, chunks
+            )
+            for entries in tqdm(samples, total=len(chunks)):
+                for entry in entries:
+                    response = entry.pop("response")
+                    responses[entry["iteration"]] = response
+                    if cache:
+                        cache.put(cache_keys[entry["iteration"]], response)
+                    if sample_log is not None:
+                        sample_log.append(entry)
+
+    return [{"iteration": iteration, "response": responses[iteration]} for iteration in sorted(responses)]
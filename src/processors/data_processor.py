@@ -1,3 +1,5 @@
+import numpy as np
+
 from utils.mapping_dict import key_translation
 
 def translate_and_convert_to_string(summary_result: dict) -> str:
@@ -145,4 +147,137 @@ def extract_workstyle_info(workstyle_result: dict, summary_result: dict) -> dict
         "compute_workstyle_total_evalation": compute_workstyle_total_evalation,
     }
 
-    return result
\ No newline at end of file
+    return result
+
+# ---------------------------------------------------------------------------
+# batch 처리: 여러 레코드를 한 번에 열(column) 배열로 펼쳐서 계산
+# 결과 dict는 process_vision_result / extract_workstyle_info와 값과 문자열 표현이 모두 같다.
+# (프롬프트 입력이 같아야 completion 캐시 key도 같아진다.)
+# ---------------------------------------------------------------------------
+
+def _flatten_keywords(keyword_dicts: list) -> tuple:
+    """[{keyword: score}, ...] -> (소유 레코드 배열, 레코드별 시작 위치, 키워드 목록, 점수 목록). dict 순서 유지"""
+    sizes = np.fromiter((len(keywords) for keywords in keyword_dicts), dtype=np.int64, count=len(keyword_dicts))
+    owners = np.repeat(np.arange(len(keyword_dicts)), sizes)
+    starts = np.cumsum(sizes) - sizes
+    names = [keyword for keywords in keyword_dicts for keyword in keywords]
+    scores = [score for keywords in keyword_dicts for score in keywords.values()]
+    return owners, starts, names, scores
+
+
+def _format_pairs(names: list, scores: list, order) -> list:
+    # 원본 값으로 "키워드:점수" 문자열 생성 (convert_keywords_to_string과 동일한 표현)
+    return [f"{names[i]}:{scores[i]}" for i in order]
+
+
+def batch_top_and_remaining_keywords(keyword_dicts: list, top_n: int = 3) -> tuple:
+    """
+    레코드별 키워드를 점수 내림차순으로 정렬하여 (상위 n개 문자열 목록, 나머지 문자열 목록) 반환
+
+    레코드 번호 + 점수로 stable 정렬하므로 같은 점수는 원래 순서를 유지한다. (sorted(reverse=True)와 동일)
+    """
+    owners, starts, names, scores = _flatten_keywords(keyword_dicts)
+    order = np.lexsort((-np.asarray(scores, dtype=np.float64), owners))
+    pairs = _format_pairs(names, scores, order)
+
+    ends = np.append(starts[1:], len(pairs))
+    top, remaining = [], []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        split = min(start + top_n, end)
+        top.append(", ".join(pairs[start:split]))
+        remaining.append(", ".join(pairs[split:end]))
+    return top, remaining
+
+
+def batch_keywords_to_string(keyword_dicts: list) -> list:
+    """레코드별 키워드를 dict 순서 그대로 "키워드:점수, ..." 문자열로 변환"""
+    owners, starts, names, scores = _flatten_keywords(keyword_dicts)
+    pairs = _format_pairs(names, scores, range(len(names)))
+    ends = np.append(starts[1:], len(pairs))
+    return [", ".join(pairs[start:end]) for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def batch_evaluation(scores, ceilings, high_rates, middle_rates) -> np.ndarray:
+    """동적 임계값(ceiling * rate / 100) 기준 우수 / 보통 / 검토 필요 등급 배열"""
+    scores = np.asarray(scores, dtype=np.float64)
+    ceilings = np.asarray(ceilings, dtype=np.float64)
+    high_threshold = ceilings * np.asarray(high_rates, dtype=np.float64) / 100
+    middle_threshold = ceilings * np.asarray(middle_rates, dtype=np.float64) / 100
+    return np.select(
+        [scores >= high_threshold, (middle_threshold <= scores) & (scores < high_threshold)],
+        ["우수", "보통"],
+        default="검토 필요"
+    )
+
+
+def _culture_fit_columns(summary_results: list, ceiling_key: str) -> tuple:
+    cal_culture_fit = [summary['calCulturefit'] for summary in summary_results]
+    return (
+        [fit.get(ceiling_key) for fit in cal_culture_fit],
+        [fit.get('highCultureScore') for fit in cal_culture_fit],
+        [fit.get('middleCultureScore') for fit in cal_culture_fit],
+    )
+
+
+def batch_process_vision_result(vision_results: list, summary_results: list) -> list:
+    """process_vision_result의 batch 버전"""
+    company_top, company_remaining = batch_top_and_remaining_keywords(
+        [vision['company']['keyWord'] for vision in vision_results])
+    compute_top, compute_remaining = batch_top_and_remaining_keywords(
+        [vision['compute']['keyWord'] for vision in vision_results])
+
+    ceilings, high_rates, middle_rates = _culture_fit_columns(summary_results, 'visionPercent')
+    evaluations = batch_evaluation([summary.get('visionScore') for summary in summary_results],
+                                   ceilings, high_rates, middle_rates)
+
+    return [
+        {
+            "company_top_keywords": company_top[i],
+            "company_remaining_keywords": company_remaining[i],
+            "compute_top_keywords": compute_top[i],
+            "compute_remaining_keywords": compute_remaining[i],
+            "compute_vision_total_evalation": str(evaluations[i]),
+        }
+        for i in range(len(vision_results))
+    ]
+
+
+def batch_extract_workstyle_info(workstyle_results: list, summary_results: list) -> list:
+    """extract_workstyle_info의 batch 버전"""
+    company_keywords = batch_keywords_to_string([workstyle['company']['keyWord'] for workstyle in workstyle_results])
+    compute_keywords = batch_keywords_to_string([workstyle['compute']['keyWord'] for workstyle in workstyle_results])
+
+    company_totals = [workstyle['company']['totalScore'] for workstyle in workstyle_results]
+    compute_totals = [workstyle['compute']['totalScore'] for workstyle in workstyle_results]
+    comparison_ratios = (np.asarray(compute_totals, dtype=np.float64)
+                         / np.asarray(company_totals, dtype=np.float64) * 100).tolist()
+
+    ceilings, high_rates, middle_rates = _culture_fit_columns(summary_results, 'workStylePercent')
+    evaluations = batch_evaluation([summary['workStyleScore'] for summary in summary_results],
+                                   ceilings, high_rates, middle_rates)
+
+    return [
+        {
+            "company_keywords": company_keywords[i],
+            "compute_keywords": compute_keywords[i],
+            "workstyle_match_percentage": workstyle_results[i]['rate'],
+            "workstyle_company_total_score": company_totals[i],
+            "workstyle_compute_total_score": compute_totals[i],
+            "comparison_ratio": comparison_ratios[i],
+            "compute_workstyle_total_evalation": str(evaluations[i]),
+        }
+        for i in range(len(workstyle_results))
+    ]
+
+
+def process_batch(records: list) -> tuple:
+    """
+    dev-survey-result 레코드 목록 전체를 한 번에 전처리
+
+    Returns:
+        tuple: (vision_data 목록, workstyle_data 목록). 각 원소는 단건 함수의 반환값과 같다.
+    """
+    summary_results = [record['summaryResult'] for record in records]
+    vision_data = batch_process_vision_result([record['visionResult'] for record in records], summary_results)
+    workstyle_data = batch_extract_workstyle_info([record['workstyleResult'] for record in records], summary_results)
+    return vision_data, workstyle_data
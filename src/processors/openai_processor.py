@@ -4,29 +4,47 @@ import asyncio
 
 from typing import Dict, List, Any
 
+from utils.llm_metrics import record_cache_hits
+from utils.completion_cache import CompletionCache, resolve_cache
+from processors.rate_limiter import get_rate_limiter
+
 from dotenv import load_dotenv
 load_dotenv("/home/pervinco/LLM-tutorials/keys.env")
 openai_api_key = os.getenv('GRAVY_LAB_OPENAI')
 
-openai_client = openai.AsyncOpenAI(api_key=openai_api_key)
+openai_client = openai.AsyncOpenAI(api_key=openai_api_key, max_retries=0)
 
 async def chatgpt_response(
     prompt: List[Dict[str, Any]],
     model: str = 'gpt-4o',
-    retry_count: int = 1,
+    retry_count: int = 6,
+    cache=None,
 ) -> str:
 
     # model = 'gpt-4o-mini'
     temperature = 0
+    seed = 456
+
+    cache = resolve_cache(cache)
+    cache_key = CompletionCache.make_key(model=model, messages=prompt, temperature=temperature, seed=seed)
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_cache_hits("chat", model)
+            return cached
+
+    # OpenAI API 호출 (429/5xx는 rate limiter가 백오프 후 최대 retry_count회까지 재시도)
+    limiter = get_rate_limiter(model)
+    response = await limiter.call_async(
+        openai_client.chat.completions.with_raw_response.create,
+        model=model,
+        messages=prompt,
+        temperature=temperature,
+        seed=seed,
+        max_attempts=retry_count
+    )
 
-    for attempt in range(retry_count):
-        # OpenAI API 호출
-        response = await openai_client.chat.completions.create(
-            model=model,
-            messages=prompt,
-            temperature=temperature,
-            seed=456
-        )
-
-        result = response.choices[0].message.content
-        return result  # 성공적인 응답 반환
\ No newline at end of file
+    result = response.choices[0].message.content
+    if cache:
+        cache.put(cache_key, result)
+    return result  # 성공적인 응답 반환
@@ -1,5 +1,7 @@
 from typing import Union
 
+from processors.prompt_templates import PromptTemplate
+
 summary_prompt = """
 목표: 채용 피검사자의 결과를 바탕으로, 피검사자가 해당 기업에 얼마나 적합한지 종합적으로 평가하고, 채용 여부를 결정하는 데 필요한 코멘트를 작성하는 것입니다.
 작업 설명: 피검사자의 채용 권장 수준, 입사 후 적응 기간, 조기 퇴사 가능성, 갈등 유발 요인, 검사 항목별 결과, 이직 요인, 장기 재직 요인을 고려하여, 피검사자가 기업에 적합한지 평가하는 코멘트를 작성합니다. 이 코멘트는 채용 담당자가 피검사자의 적합성을 빠르고 정확하게 판단할 수 있도록 돕기 위한 것입니다.
@@ -89,88 +91,43 @@ workstyle_prompt = """
 """
 
 
-def generate_vision_prompt(processed_data: dict) -> list:
-    company_top_keywords = processed_data['company_top_keywords']
-    company_remaining_keywords = processed_data['company_remaining_keywords']
-    compute_top_keywords = processed_data['compute_top_keywords']
-    compute_remaining_keywords = processed_data['compute_remaining_keywords']
-    
-    # 종합 평가
-    compute_vision_total_evalation = processed_data['compute_vision_total_evalation']
-    
-    # print('company_top_keywords', company_top_keywords)
-    # print('company_remaining_keywords', company_remaining_keywords)
-    # print('compute_top_keywords', compute_top_keywords)
-    # print('compute_remaining_keywords', compute_remaining_keywords)
-
-    prompt = vision_prompt
-    content = (
-        f"기업의 상위 3개 비전 키워드와 점수: {company_top_keywords}\n"
-        f"기업의 상위 3개 외 비전 키워드와 점수: {company_remaining_keywords}\n"
-        f"피검사자의 비전 키워드와 점수: {compute_top_keywords}, {compute_remaining_keywords}\n"
-        # f"기업의 비전 키워드와 점수: {company_top_keywords}, {company_remaining_keywords}\n"
-        f"피검사자와 기업의 비전 적합성 평가 결과 : {compute_vision_total_evalation}\n"
+# system 메시지는 레코드와 무관하게 항상 같은 문자열 (prompt caching prefix)
+VISION_TEMPLATE = PromptTemplate(
+    "vision", "v1",
+    system=f"※필수지침사항:\n{vision_prompt}",
+    user=(
+        "기업의 상위 3개 비전 키워드와 점수: {company_top_keywords}\n"
+        "기업의 상위 3개 외 비전 키워드와 점수: {company_remaining_keywords}\n"
+        "피검사자의 비전 키워드와 점수: {compute_top_keywords}, {compute_remaining_keywords}\n"
+        "피검사자와 기업의 비전 적합성 평가 결과 : {compute_vision_total_evalation}\n"
     )
+)
+
+WORKSTYLE_TEMPLATE = PromptTemplate(
+    "workstyle", "v1",
+    system=f"※필수지침사항:\n{workstyle_prompt}",
+    user=(
+        "기업의 업무 성향 키워드 및 점수: {company_keywords}\n"
+        "피검사자의 업무 성향 키워드와 점수: {compute_keywords}\n"
+        "피검사자와 기업의 업무 성향 적합성 평가 결과 : {compute_workstyle_total_evalation}\n"
+    )
+)
 
-    messages = [
-        {
-            "role": "system",
-            "content": f"※필수지침사항:\n{prompt}"
-        },
-        {
-            "role": "user",
-            "content": content
-        },
-    ]
+# user content는 translate_and_convert_to_string으로 만든 문자열 그대로
+SUMMARY_TEMPLATE = PromptTemplate(
+    "summary", "v1",
+    system=f"※필수지침사항:\n{summary_prompt}",
+    user="{summary}"
+)
 
-    return messages
+
+def generate_vision_prompt(processed_data: dict) -> list:
+    return VISION_TEMPLATE.messages(processed_data)
 
 
 def generate_workstyle_prompt(processed_data: dict) -> list:
-    company_keywords = processed_data['company_keywords']
-    compute_keywords = processed_data['compute_keywords']
-    workstyle_match_percentage = processed_data['workstyle_match_percentage']
-    # workstyle_company_total_score = processed_data['workstyle_company_total_score']
-    # workstyle_compute_total_score = processed_data['workstyle_compute_total_score']
-    # comparison_ratio = processed_data['comparison_ratio']
-    
-    # 종합 평가
-    compute_workstyle_total_evalation = processed_data['compute_workstyle_total_evalation']
-    prompt = workstyle_prompt
-
-    content = (
-        f"기업의 업무 성향 키워드 및 점수: {company_keywords}\n"
-        f"피검사자의 업무 성향 키워드와 점수: {compute_keywords}\n"
-        f"피검사자와 기업의 업무 성향 적합성 평가 결과 : {compute_workstyle_total_evalation}\n"
-    )
+    return WORKSTYLE_TEMPLATE.messages(processed_data)
+
 
-    messages = [
-        {
-            "role": "system",
-            "content": f"※필수지침사항:\n{prompt}"
-        },
-        {
-            "role": "user",
-            "content": content
-        },
-    ]
-    
-    return messages
-
-
-def generate_summary_prompt(processed_data: dict) -> list:
-    prompt = summary_prompt
-    content = processed_data
-
-    messages = [
-        {
-            "role": "system",
-            "content": f"※필수지침사항:\n{prompt}"
-        },
-        {
-            "role": "user",
-            "content": content
-        },
-    ]
-
-    return messages
\ No newline at end of file
+def generate_summary_prompt(processed_data: str) -> list:
+    return SUMMARY_TEMPLATE.messages({"summary": processed_data})
@@ -1,69 +1,50 @@
 from typing import Union
-from src.prompts_v2 import summary_default_prompt, vision_default_prompt, workstyle_default_prompt
 
-def generate_vision_prompt(processed_data: dict) -> list:
-    company_top_keywords = processed_data['company_top_keywords']
-    company_remaining_keywords = processed_data['company_remaining_keywords']
-    compute_top_keywords = processed_data['compute_top_keywords']
-    compute_remaining_keywords = processed_data['compute_remaining_keywords']
-    compute_vision_total_evalation = processed_data['compute_vision_total_evalation']
-
-    content = (
-        f"기업 상위 3개 비전 키워드: {company_top_keywords}\n"
-        f"기업 기타 비전 키워드: {company_remaining_keywords}\n"
-        f"피검사자 비전 키워드: {compute_top_keywords}, {compute_remaining_keywords}\n"
-        f"비전 적합성 평가 결과: {compute_vision_total_evalation}\n"
+from processors.prompt_templates import PromptTemplate
+from processors.data_processor import translate_and_convert_to_string
+from processors.prompts_v2 import summary_default_prompt, vision_default_prompt, workstyle_default_prompt
+
+VISION_TEMPLATE = PromptTemplate(
+    "vision", "v2",
+    system=vision_default_prompt,
+    user=(
+        "기업 상위 3개 비전 키워드: {company_top_keywords}\n"
+        "기업 기타 비전 키워드: {company_remaining_keywords}\n"
+        "피검사자 비전 키워드: {compute_top_keywords}, {compute_remaining_keywords}\n"
+        "비전 적합성 평가 결과: {compute_vision_total_evalation}\n"
     )
+)
+
+WORKSTYLE_TEMPLATE = PromptTemplate(
+    "workstyle", "v2",
+    system=workstyle_default_prompt,
+    user=(
+        "기업 업무성향 키워드: {company_keywords}\n"
+        "피검사자 업무성향 키워드: {compute_keywords}\n"
+        "업무 성향 적합성 평가 결과: {compute_workstyle_total_evalation}\n"
+    )
+)
 
-    messages = [
-        {
-            "role": "system",
-            "content": vision_default_prompt
-        },
-        {
-            "role": "user",
-            "content": content
-        },
-    ]
-    return messages
-
+# Chain of Thought 지침은 summary_default_prompt에 이미 반영되어 있음.
+# 내부적으로 사고를 거친 뒤 최종 답변만 출력하도록 합니다.
+SUMMARY_TEMPLATE = PromptTemplate(
+    "summary", "v2",
+    system=summary_default_prompt,
+    user="{summary}"
+)
 
-def generate_workstyle_prompt(processed_data: dict) -> list:
-    company_keywords = processed_data['company_keywords']
-    compute_keywords = processed_data['compute_keywords']
-    compute_workstyle_total_evalation = processed_data['compute_workstyle_total_evalation']
 
-    content = (
-        f"기업 업무성향 키워드: {company_keywords}\n"
-        f"피검사자 업무성향 키워드: {compute_keywords}\n"
-        f"업무 성향 적합성 평가 결과: {compute_workstyle_total_evalation}\n"
-    )
+def generate_vision_prompt(processed_data: dict) -> list:
+    return VISION_TEMPLATE.messages(processed_data)
 
-    messages = [
-        {
-            "role": "system",
-            "content": workstyle_default_prompt
-        },
-        {
-            "role": "user",
-            "content": content
-        },
-    ]
 
-    return messages
+def generate_workstyle_prompt(processed_data: dict) -> list:
+    return WORKSTYLE_TEMPLATE.messages(processed_data)
 
 
-def generate_summary_prompt(processed_data: dict) -> list:
-    # Chain of Thought 지침은 summary_default_prompt에 이미 반영되어 있음.
-    # 내부적으로 사고를 거친 뒤 최종 답변만 출력하도록 합니다.
-    messages = [
-        {
-            "role": "system",
-            "content": summary_default_prompt
-        },
-        {
-            "role": "user",
-            "content": str(processed_data)
-        },
-    ]
-    return messages
+def generate_summary_prompt(processed_data: Union[dict, str]) -> list:
+    # summaryResult dict를 그대로 str()로 넣으면 dict repr(따옴표, 괄호, 영문 key)이 토큰을 낭비하므로
+    # v1과 같이 번역된 항목 문자열로 변환한다.
+    if isinstance(processed_data, dict):
+        processed_data = translate_and_convert_to_string(processed_data)
+    return SUMMARY_TEMPLATE.messages({"summary": processed_data})
@@ -0,0 +1,112 @@
+from string import Formatter
+
+from processors.rate_limiter import estimate_tokens
+
+# (name, version) -> PromptTemplate
+TEMPLATES = {}
+
+
+class PromptTemplate:
+    """
+    system prompt + user content 템플릿
+
+    user 템플릿은 정의할 때 한 번만 파싱(compile)하여 필드 목록을 고정하고, 레코드마다 문자열 조각만 이어 붙인다.
+    system 메시지는 레코드와 무관한 고정 문자열을 항상 메시지 맨 앞에 두므로,
+    모든 요청이 byte 단위로 같은 prefix를 가져 provider 측 prompt caching이 적용된다.
+    (레코드별 값은 user 메시지에만 들어가야 한다.)
+
+    Args:
+        name (str): 템플릿 이름 (vision, workstyle, summary ...)
+        version (str): 프롬프트 버전 (v1, v2, cot ...)
+        system (str): system prompt. None이면 user 메시지만 생성
+        user (str): str.format 형식의 user content 템플릿 ({field} 또는 {field!r:spec})
+    """
+
+    def __init__(self, name, version, system, user):
+        self.name = name
+        self.version = version
+        self.system = system
+        self.user = user
+        self._parts = self._compile(user)
+        self.fields = tuple(dict.fromkeys(field for _, field, _, _ in self._parts if field is not None))
+
+        # 모듈이 다시 로드되면(streamlit 파일 변경 감지 등) 같은 key를 덮어쓴다.
+        TEMPLATES[(name, version)] = self
+
+    def _compile(self, template):
+        parts = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if field is not None and not field.isidentifier():
+                raise ValueError(f"prompt template {self.name}/{self.version}: invalid field '{{{field}}}'")
+            parts.append((literal, field, spec or "", conversion))
+        return parts
+
+    def render(self, values) -> str:
+        """
+        user content 생성. f-string으로 만든 기존 문자열과 같은 결과를 반환한다.
+
+        Args:
+            values (dict): 필드 값. 템플릿에 없는 key는 무시
+        Raises:
+            KeyError: 필수 필드가 없을 때
+        """
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise KeyError(f"prompt template {self.name}/{self.version} is missing fields: {missing}")
+
+        chunks = []
+        for literal, field, spec, conversion in self._parts:
+            chunks.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion == "r":
+                    value = repr(value)
+                elif conversion == "s":
+                    value = str(value)
+                elif conversion == "a":
+                    value = ascii(value)
+                chunks.append(format(value, spec))
+        return "".join(chunks)
+
+    def messages(self, values) -> list:
+        """chat messages 생성 (system 메시지는 항상 같은 문자열)"""
+        messages = []
+        if self.system is not None:
+            messages.append({"role": "system", "content": self.system})
+        messages.append({"role": "user", "content": self.render(values)})
+        return messages
+
+    def token_counts(self, model="gpt-4o") -> dict:
+        """system prompt와 user 템플릿 고정 문구(필드 제외)의 토큰 수"""
+        static_user = "".join(literal for literal, _, _, _ in self._parts)
+        system_tokens = estimate_tokens(self.system, model) if self.system is not None else 0
+        return {
+            "template": f"{self.name}/{self.version}",
+            "fields": len(self.fields),
+            "system_tokens": system_tokens,
+            "user_static_tokens": estimate_tokens(static_user, model),
+        }
+
+
+def get_template(name, version) -> PromptTemplate:
+    try:
+        return TEMPLATES[(name, version)]
+    except KeyError:
+        raise KeyError(f"unknown prompt template {name}/{version}") from None
+
+
+def template_token_report(model="gpt-4o") -> list:
+    """등록된 모든 템플릿의 토큰 수 목록"""
+    return [template.token_counts(model) for _, template in sorted(TEMPLATES.items())]
+
+
+if __name__ == "__main__":
+    # 템플릿은 각 prompt processor 모듈을 import할 때 등록된다.
+    import processors.prompt_processor  # noqa: F401
+    import processors.prompt_processor_v2  # noqa: F401
+    import processors.cot_prompt_processor  # noqa: F401
+    from processors.prompt_templates import template_token_report as registered_token_report
+
+    for row in registered_token_report():
+        print(f"{row['template']:<16} fields={row['fields']:<3} "
+              f"system={row['system_tokens']:<6} user_static={row['user_static_tokens']}")
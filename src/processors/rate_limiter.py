@@ -0,0 +1,283 @@
+import time
+import random
+import asyncio
+import threading
+
+import openai
+
+from utils.llm_metrics import record_call
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 응답 헤더로 실제 한도를 확인하기 전까지 사용하는 보수적인 기본값
+DEFAULT_LIMITS = {
+    "gpt-4o": {"rpm": 500, "tpm": 30_000},
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200_000},
+    "text-embedding-3-large": {"rpm": 3_000, "tpm": 1_000_000},
+    "text-embedding-ada-002": {"rpm": 3_000, "tpm": 1_000_000},
+}
+FALLBACK_LIMITS = {"rpm": 500, "tpm": 30_000}
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+
+
+def estimate_tokens(content, model="gpt-4o") -> int:
+    """
+    요청 전 프롬프트 토큰 수를 추정
+
+    Args:
+        content (str | list): 문자열, 문자열 리스트 또는 chat messages 리스트
+    """
+    if isinstance(content, list):
+        total = 0
+        for item in content:
+            if isinstance(item, dict):
+                # 메시지마다 role 등 포맷 토큰이 추가된다.
+                total += 4 + estimate_tokens(item.get("content") or "", model)
+            else:
+                total += estimate_tokens(item, model)
+        return total
+
+    text = str(content)
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return len(encoding.encode(text))
+
+    # tiktoken이 없으면 ASCII는 4자당 1토큰, 한글 등 그 외 문자는 1자당 1토큰으로 근사
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class TokenBucket:
+    """분당 허용량(rate_per_minute)만큼 채워지는 토큰 버킷"""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def reserve(self, amount) -> float:
+        """amount만큼 미리 차감하고, 잔량이 음수가 되면 회복까지 기다려야 할 시간(초)을 반환"""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens * 60 / self.capacity)
+
+    def refund(self, amount):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def set_limit(self, rate_per_minute, remaining=None):
+        self._refill()
+        self.capacity = float(rate_per_minute)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+        self.tokens = min(self.tokens, self.capacity)
+
+
+class RateLimiter:
+    """
+    요청 수(RPM)와 토큰 수(TPM)를 별도 버킷으로 관리하는 재시도 스케줄러
+
+    - 요청 전 프롬프트 토큰을 추정하여 두 버킷에서 미리 차감
+    - 429/5xx/연결 오류는 지수 백오프 + jitter로 재시도 (retry-after 헤더 우선)
+    - x-ratelimit-* 응답 헤더로 실제 한도를 반영하고, 429 발생 시 동시 요청 수를 절반으로 줄인 뒤 성공할 때마다 1씩 회복
+
+    재시도는 이 클래스에서만 해야 하므로 client는 max_retries=0으로 만들어야 한다.
+    (SDK 기본값이면 429/5xx를 SDK가 먼저 재시도하여 백오프와 동시 요청 수 조절이 동작하지 않는다.)
+    """
+
+    def __init__(self, rpm, tpm, max_concurrency=32, max_attempts=6, base_delay=1.0, max_delay=60.0,
+                 expected_completion_tokens=500):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.expected_completion_tokens = expected_completion_tokens
+
+        self.retries = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    # ---- 슬롯/버킷 관리 ----
+    def _try_enter(self, tokens):
+        """동시 요청 슬롯을 얻으면 버킷 대기 시간을, 슬롯이 없으면 None을 반환"""
+        with self._lock:
+            if self._in_flight >= self.concurrency:
+                return None
+            self._in_flight += 1
+            return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def _refund(self, tokens):
+        """실패한 시도가 미리 차감한 요청 수/토큰을 되돌린다 (재시도 시 다시 차감)"""
+        with self._lock:
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+
+    def _leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _settle(self, reserved, response):
+        """실제 사용량(usage)이 있으면 미리 차감한 토큰과의 차이를 되돌려준다."""
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if total_tokens is not None:
+            with self._lock:
+                self.tokens.refund(reserved - total_tokens)
+
+    def update_from_headers(self, headers):
+        def header_int(name):
+            value = headers.get(name)
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+
+        limit_requests = header_int("x-ratelimit-limit-requests")
+        limit_tokens = header_int("x-ratelimit-limit-tokens")
+        with self._lock:
+            if limit_requests:
+                self.requests.set_limit(limit_requests, header_int("x-ratelimit-remaining-requests"))
+            if limit_tokens:
+                self.tokens.set_limit(limit_tokens, header_int("x-ratelimit-remaining-tokens"))
+
+    def _on_success(self):
+        with self._lock:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def _on_retry(self, error):
+        with self._lock:
+            self.retries += 1
+            if isinstance(error, openai.RateLimitError):
+                self.concurrency = max(1, self.concurrency // 2)
+
+    def _backoff_delay(self, attempt, error) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            if retry_after is not None:
+                return float(retry_after) + random.uniform(0, 1)
+        except ValueError:
+            pass
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def _is_retryable(self, error) -> bool:
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code in (408, 409)
+
+    def _reserved_tokens(self, kwargs):
+        model = kwargs.get("model", "gpt-4o")
+        prompt = kwargs.get("messages", kwargs.get("input", ""))
+        completion = kwargs.get("max_tokens") or (self.expected_completion_tokens if "messages" in kwargs else 0)
+        return estimate_tokens(prompt, model) + completion * kwargs.get("n", 1)
+
+    # ---- 호출 ----
+    @staticmethod
+    def _record(kwargs, started, attempt, response=None, request_started=None):
+        """호출 한 건의 토큰/지연 시간/재시도 기록 (utils.llm_metrics)"""
+        now = time.monotonic()
+        record_call(
+            "embedding" if "input" in kwargs else "chat",
+            kwargs.get("model", ""),
+            ok=response is not None,
+            usage=getattr(response, "usage", None),
+            latency=now - request_started if response is not None else None,
+            elapsed=now - started,
+            retries=attempt
+        )
+
+    def call(self, raw_create, max_attempts=None, **kwargs):
+        """
+        동기 호출. raw_create는 with_raw_response.create 형태의 함수여야 한다.
+        예: limiter.call(client.chat.completions.with_raw_response.create, model=..., messages=...)
+        """
+        reserved = self._reserved_tokens(kwargs)
+        max_attempts = max_attempts or self.max_attempts
+        started = time.monotonic()
+        for attempt in range(max_attempts):
+            wait = self._try_enter(reserved)
+            while wait is None:
+                time.sleep(0.05)
+                wait = self._try_enter(reserved)
+            try:
+                time.sleep(wait)
+                request_started = time.monotonic()
+                raw = raw_create(**kwargs)
+            except Exception as e:
+                self._refund(reserved)
+                if not self._is_retryable(e) or attempt == max_attempts - 1:
+                    self._record(kwargs, started, attempt)
+                    raise
+                self._on_retry(e)
+                time.sleep(self._backoff_delay(attempt, e))
+                continue
+            finally:
+                self._leave()
+
+            self.update_from_headers(raw.headers)
+            response = raw.parse()
+            self._settle(reserved, response)
+            self._on_success()
+            self._record(kwargs, started, attempt, response, request_started)
+            return response
+
+    async def call_async(self, raw_create, max_attempts=None, **kwargs):
+        """비동기 호출. raw_create는 AsyncOpenAI의 with_raw_response.create 함수여야 한다."""
+        reserved = self._reserved_tokens(kwargs)
+        max_attempts = max_attempts or self.max_attempts
+        started = time.monotonic()
+        for attempt in range(max_attempts):
+            wait = self._try_enter(reserved)
+            while wait is None:
+                await asyncio.sleep(0.05)
+                wait = self._try_enter(reserved)
+            try:
+                await asyncio.sleep(wait)
+                request_started = time.monotonic()
+                raw = await raw_create(**kwargs)
+            except Exception as e:
+                self._refund(reserved)
+                if not self._is_retryable(e) or attempt == max_attempts - 1:
+                    self._record(kwargs, started, attempt)
+                    raise
+                self._on_retry(e)
+                await asyncio.sleep(self._backoff_delay(attempt, e))
+                continue
+            finally:
+                self._leave()
+
+            self.update_from_headers(raw.headers)
+            response = raw.parse()
+            self._settle(reserved, response)
+            self._on_success()
+            self._record(kwargs, started, attempt, response, request_started)
+            return response
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model) -> RateLimiter:
+    """모델별로 공유되는 RateLimiter 반환 (OpenAI 한도는 모델 단위로 적용된다)"""
+    with _limiters_lock:
+        if model not in _limiters:
+            limits = DEFAULT_LIMITS.get(model, FALLBACK_LIMITS)
+            _limiters[model] = RateLimiter(rpm=limits["rpm"], tpm=limits["tpm"])
+        return _limiters[model]
@@ -5,7 +5,11 @@ import matplotlib.pyplot as plt
 
 from tqdm import tqdm
 from sklearn.manifold import TSNE
-from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.similarity import mean_pairwise_cosine
+from utils.embedding_store import EmbeddingStore
+from utils.ngram_similarity import ngram_similarity
+from utils.embedding_service import get_embedding_service
 
 
 def create_results_dataframe(vision_results, workstyle_results, summary_results):
@@ -25,54 +29,72 @@ def create_results_dataframe(vision_results, workstyle_results, summary_results)
 
 
 def calculate_embedding_similarity_and_embeddings(responses, client, embed_model):
-    embeddings = []
-    for response in responses:
-        embedding_response = client.embeddings.create(
-            input=response,
-            model=embed_model
-        )
-        embeddings.append(embedding_response.data[0].embedding)
-
-    embeddings = np.array(embeddings)
-    similarity_matrix = cosine_similarity(embeddings)
-    mean_similarity = similarity_matrix.mean()
+    # 중복 응답 제거, 디스크 캐시 조회, 배치 요청은 EmbeddingService가 처리
+    embeddings = get_embedding_service(client, embed_model).embed(responses)
+    # N x N 유사도 행렬 대신 정규화 벡터 합으로 평균 계산 (cosine_similarity(X).mean()과 동일)
+    mean_similarity = mean_pairwise_cosine(embeddings)
     
     return mean_similarity, embeddings
 
 
-def calculate_n_gram_similarity(responses, num_gram):
-    def n_grams(text, n):
-        words = text.split()
-        return [tuple(words[i:i + n]) for i in range(len(words) - n + 1)]
+def calculate_n_gram_similarity(responses, num_gram, method="exact"):
+    # 응답별 토큰화는 한 번만 수행하고, 모든 쌍의 Jaccard 유사도는 희소 행렬 연산으로 계산
+    n_gram_similarities, _ = ngram_similarity(responses, num_gram, method=method)
+    return n_gram_similarities
 
-    def n_gram_overlap(response1, response2, n):
-        ngrams1 = set(n_grams(response1, n))
-        ngrams2 = set(n_grams(response2, n))
-        return len(ngrams1 & ngrams2) / len(ngrams1 | ngrams2) if ngrams1 | ngrams2 else 0
 
-    n_gram_similarities = []
-    for n in range(1, num_gram + 1):
-        similarities = [
-            n_gram_overlap(responses[i], responses[j], n)
-            for i in range(len(responses)) for j in range(i + 1, len(responses))
-        ]
-        n_gram_similarities.append(sum(similarities) / len(similarities))
+def embedding_store_keys(df):
+    """df 각 행의 (record, section, variant, iteration) key. record/variant 컬럼이 없으면 0/'default' 사용"""
+    records = df['record'] if 'record' in df else [0] * len(df)
+    variants = df['variant'] if 'variant' in df else ['default'] * len(df)
+    return [
+        (int(record), response_type, variant, int(iteration))
+        for record, response_type, variant, iteration in zip(records, df['type'], variants, df['iteration'])
+    ]
 
-    return n_gram_similarities
 
+def analyze_responses(df, client, ng_gram, embed_model, store_path=None):
+    """
+    type별 의미/n-gram 유사도 분석
 
-def analyze_responses(df, client, ng_gram, embed_model):
+    store_path를 지정하면 임베딩을 EmbeddingStore에 저장하고,
+    이미 저장된 실행(같은 key, 같은 응답 텍스트)이라면 API 호출 없이 저장소의 벡터를 사용한다.
+    key가 중복되면(record/variant 컬럼 없이 여러 실행을 합친 경우 등) 저장소를 쓰지 않는다.
+    """
     results = {}
 
+    keys = embedding_store_keys(df)
+    responses = df['response'].tolist()
+    if store_path is not None and len(set(keys)) != len(keys):
+        print(f"Embedding store skipped: duplicate (record, type, variant, iteration) keys in {store_path}")
+        store_path = None
+
+    store = None
+    if store_path is not None and os.path.exists(store_path):
+        store = EmbeddingStore(store_path, model=embed_model)
+
+    if store is None or not store.matches(keys, responses):
+        # 모든 type의 응답을 한 번에 임베딩해 두면 type별 계산은 캐시에서 바로 읽힌다.
+        embeddings = get_embedding_service(client, embed_model).embed(responses)
+        if store_path is not None:
+            store = store or EmbeddingStore(store_path, dim=embeddings.shape[1], model=embed_model)
+            store.append(keys, embeddings, responses)
+
     for response_type in ['vision', 'workstyle', 'summary']:
-        type_responses = df[df['type'] == response_type]['response'].tolist()
+        mask = (df['type'] == response_type).to_numpy()
+        type_responses = df.loc[mask, 'response'].tolist()
 
-        mean_similarity, embeddings = calculate_embedding_similarity_and_embeddings(type_responses, client, embed_model)
-        n_gram_similarities = calculate_n_gram_similarity(type_responses, ng_gram)
+        if store is not None:
+            embeddings = np.asarray(store.get([key for key, selected in zip(keys, mask) if selected]))
+            mean_similarity = mean_pairwise_cosine(embeddings)
+        else:
+            mean_similarity, embeddings = calculate_embedding_similarity_and_embeddings(type_responses, client, embed_model)
+        n_gram_similarities, n_gram_matrices = ngram_similarity(type_responses, ng_gram)
 
         results[response_type] = {
             'semantic_similarity': mean_similarity,
             'n_gram_similarities': n_gram_similarities,
+            'n_gram_matrices': n_gram_matrices,
             'embeddings': embeddings
         }
 
@@ -101,28 +123,19 @@ def plot_ngram_similarities(analysis_results, save_path=None):
     plt.show()
 
 
-def plot_embeddings_tsne(df, client, save_path=None):
+def plot_embeddings_tsne(analysis_results, save_path=None):
     """
     각 type별 응답들의 임베딩을 t-SNE로 2D 시각화
+
+    analyze_responses에서 계산한 임베딩을 그대로 사용하므로 추가 API 호출이 없다.
     """
-    # 임베딩 생성
-    def get_embedding(text, model="text-embedding-ada-002"):
-        try:
-            response = client.embeddings.create(input=text, model=model)
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"Error getting embedding: {e}")
-            return None
-
-    # 각 type별로 임베딩 생성
     embeddings = []
     labels = []
-    
-    for idx, row in df.iterrows():
-        embedding = get_embedding(row['response'])
-        if embedding is not None:
-            embeddings.append(embedding)
-            labels.append(row['type'])
+
+    for response_type, metrics in analysis_results.items():
+        type_embeddings = metrics['embeddings']
+        embeddings.extend(type_embeddings)
+        labels.extend([response_type] * len(type_embeddings))
     
     if not embeddings:
         print("No valid embeddings generated")
@@ -180,7 +193,7 @@ def visualize_results(analysis_results, df, client, output_dir, prefix):
     """
     # 임베딩 t-SNE 시각화
     tsne_plot_path = os.path.join(output_dir, f'{prefix}_embedding_tsne.png')
-    plot_embeddings_tsne(df, client, tsne_plot_path)
+    plot_embeddings_tsne(analysis_results, tsne_plot_path)
 
     # n-gram 유사도 그래프
     ngram_plot_path = os.path.join(output_dir, f'{prefix}_ngram_similarities.png')
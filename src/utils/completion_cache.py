@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_CACHE_PATH = "../cache/completions.sqlite"
+
+
+class CompletionCache:
+    """
+    요청 전체(model, messages, temperature, seed, iteration 등)의 해시를 key로 하는
+    SQLite 기반 LLM completion 캐시
+
+    Args:
+        path (str): SQLite 파일 경로
+        max_entries (int): 보관할 최대 항목 수 (초과 시 오래 사용되지 않은 항목부터 삭제)
+        max_age_days (float): 항목 보관 기간 (None이면 무제한)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=200_000, max_age_days=30):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400 if max_age_days is not None else None
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed_at)")
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """요청 파라미터 전체를 정렬된 JSON으로 직렬화하여 sha256 해시 생성"""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """캐시된 응답을 반환하며, 없거나 만료된 경우 None 반환"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (self.max_age is not None and now - row[1] > self.max_age):
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), now, now)
+            )
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= 1000:
+                self._evict()
+
+    def evict(self):
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        self._puts_since_evict = 0
+        if self.max_age is not None:
+            self._conn.execute("DELETE FROM completions WHERE created_at < ?", (time.time() - self.max_age,))
+
+        if self.max_entries is not None:
+            self._conn.execute(
+                """
+                DELETE FROM completions WHERE key IN (
+                    SELECT key FROM completions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+
+_default_cache = None
+
+
+def get_completion_cache() -> CompletionCache:
+    """프로세스 전체에서 공유하는 기본 캐시 반환"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CompletionCache()
+    return _default_cache
+
+
+def resolve_cache(cache):
+    """cache 인자 해석: None이면 기본 캐시, False이면 캐시 사용 안 함"""
+    if cache is None:
+        return get_completion_cache()
+    if cache is False:
+        return None
+    return cache
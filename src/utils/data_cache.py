@@ -0,0 +1,71 @@
+import hashlib
+import pandas as pd
+import streamlit as st
+
+from utils.file import load_data
+from utils.group_stats import group_stats
+
+
+def file_content_hash(uploaded_file) -> str:
+    """
+    업로드 파일 내용의 sha256 해시
+
+    같은 업로드(file_id)에 대해서는 session_state에 저장된 값을 재사용하여
+    rerun마다 파일 전체를 다시 해시하지 않는다.
+    """
+    hashes = st.session_state.setdefault("_file_content_hashes", {})
+    file_id = getattr(uploaded_file, "file_id", None) or uploaded_file.name
+    if file_id not in hashes:
+        hashes[file_id] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return hashes[file_id]
+
+
+@st.cache_resource(max_entries=4, show_spinner="파일을 읽는 중...")
+def _load_dataframe(content_hash, _uploaded_file):
+    # cache_resource는 복사 없이 같은 객체를 반환하므로, 반환된 DataFrame은 수정하지 않아야 한다.
+    return load_data(_uploaded_file, content_hash=content_hash)
+
+
+def get_dataframe(uploaded_file):
+    """
+    업로드 파일을 파일 내용 해시당 한 번만 파싱하여 반환
+
+    Returns:
+        tuple: (DataFrame, content_hash). 파일이 없거나 읽지 못하면 (None, None)
+    """
+    if uploaded_file is None:
+        return None, None
+
+    content_hash = file_content_hash(uploaded_file)
+    df = _load_dataframe(content_hash, uploaded_file)
+    if df is None:
+        # 실패한 결과는 캐시에 남기지 않는다.
+        _load_dataframe.clear()
+        return None, None
+    return df, content_hash
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def column_describe(content_hash, column, _df):
+    return _df[column].describe()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def column_value_counts(content_hash, column, _df):
+    return _df[column].value_counts()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def grouped_mean_std(content_hash, column, filters, _df):
+    """
+    column별 filters 컬럼들의 평균/표준편차 표
+
+    Args:
+        filters (tuple): 캐시 key로 쓰이므로 tuple로 전달
+    """
+    filters = list(filters)
+    stats = group_stats(_df, [column], filters)
+    grouped_stats = stats.loc[:, pd.MultiIndex.from_product([filters, ['mean', 'std']])].reset_index()
+    grouped_stats.columns = [f"{col[0]}_{col[1]}" if col[1] else col[0] for col in grouped_stats.columns]
+    return grouped_stats
+
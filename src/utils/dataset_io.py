@@ -0,0 +1,245 @@
+import os
+import json
+import fcntl
+import tempfile
+from array import array
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+INDEX_SUFFIX = ".idx"
+OFFSET_SIZE = array("Q").itemsize
+# 압축 파일 인덱스 생성 시 frame 경계를 찾기 위해 한 번에 넘기는 크기
+SCAN_WINDOW = 16 * 1024
+
+
+def is_jsonl(path) -> bool:
+    return str(path).endswith((".jsonl", ".jsonl.zst"))
+
+
+def is_compressed(path) -> bool:
+    return str(path).endswith(".zst")
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstandard 패키지가 필요합니다: pip install zstandard")
+
+
+def _encode(record, compressed) -> bytes:
+    """레코드 한 건을 JSON 한 줄로 직렬화. 압축 파일은 레코드마다 독립적인 zstd frame으로 저장"""
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    if compressed:
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=3).compress(line)
+    return line
+
+
+def _decode(data: bytes, compressed):
+    if compressed:
+        _require_zstandard()
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return json.loads(data)
+
+
+def _scan_offsets(path) -> array:
+    """파일을 처음부터 읽어 레코드 시작 위치 + 파일 끝 위치 배열을 생성"""
+    offsets = array("Q", [0])
+    if is_compressed(path):
+        _require_zstandard()
+        size = os.path.getsize(path)
+        if size == 0:
+            return offsets
+        # frame마다 남은 파일 전체를 넘기면 O(N²)이 되므로 SCAN_WINDOW씩 읽어 넘기며 frame 끝을 찾는다.
+        with open(path, "rb") as f:
+            position = 0
+            while position < size:
+                decompressor = zstandard.ZstdDecompressor().decompressobj()
+                f.seek(position)
+                end = position
+                while not decompressor.eof:
+                    window = f.read(SCAN_WINDOW)
+                    if not window:
+                        raise ValueError(f"{path}: truncated zstd frame at offset {position}")
+                    decompressor.decompress(window)
+                    end += len(window)
+                position = end - len(decompressor.unused_data)
+                offsets.append(position)
+    else:
+        position = 0
+        with open(path, "rb") as f:
+            for line in f:
+                position += len(line)
+                if line.strip():
+                    offsets.append(position)
+                else:
+                    offsets[-1] = position
+    return offsets
+
+
+def load_index(path) -> array:
+    """
+    레코드 offset 인덱스(sidecar .idx) 로드
+
+    sidecar가 없거나 마지막 offset이 파일 크기와 다르면(외부에서 파일이 바뀐 경우) 다시 생성한다.
+    """
+    index_path = str(path) + INDEX_SUFFIX
+    size = os.path.getsize(path)
+    offsets = array("Q")
+    if os.path.exists(index_path):
+        with open(index_path, "rb") as f:
+            data = f.read()
+        # 추가 도중 중단되어 잘린 마지막 offset은 버린다 (마지막 offset이 맞지 않으므로 다시 생성됨)
+        offsets.frombytes(data[:len(data) - len(data) % OFFSET_SIZE])
+
+    if not offsets or offsets[-1] != size:
+        offsets = _scan_offsets(path)
+        _write_index(index_path, offsets)
+    return offsets
+
+
+def _index_tail(index_path):
+    """인덱스의 마지막 offset (없거나 잘린 경우 None)"""
+    try:
+        with open(index_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            length = f.tell()
+            if length == 0 or length % OFFSET_SIZE:
+                return None
+            f.seek(length - OFFSET_SIZE)
+            return array("Q", f.read(OFFSET_SIZE))[0]
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _atomic_write(path, mode="wb", **kwargs):
+    """
+    같은 디렉토리의 고유한 임시 파일에 기록한 뒤 path로 교체(atomic)
+
+    같은 파일을 여러 프로세스가 동시에 쓰더라도 각자 다른 임시 파일을 쓰므로 서로 섞이지 않는다.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    f = tempfile.NamedTemporaryFile(mode, dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False, **kwargs)
+    try:
+        with f:
+            yield f
+        # NamedTemporaryFile은 0600으로 생성되므로 append_records로 만든 파일과 같은 권한으로 맞춘다.
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+    except BaseException:
+        if os.path.exists(f.name):
+            os.remove(f.name)
+        raise
+
+
+def _write_index(index_path, offsets):
+    with _atomic_write(index_path) as f:
+        f.write(offsets.tobytes())
+
+
+def iter_records(path):
+    """
+    데이터셋 레코드를 하나씩 반환하는 generator
+
+    .jsonl/.jsonl.zst만 한 건씩 스트리밍한다. .json(단일 배열)은 기존 형식 호환을 위해
+    첫 레코드를 반환하기 전에 파일 전체를 메모리에 읽는다.
+    """
+    if not is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    if is_compressed(path):
+        offsets = load_index(path)
+        with open(path, "rb") as f:
+            for start, end in zip(offsets[:-1], offsets[1:]):
+                yield _decode(f.read(end - start), compressed=True)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def count_records(path) -> int:
+    if not is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return len(json.load(f))
+    return len(load_index(path)) - 1
+
+
+def read_record(path, idx, offsets=None):
+    """offset 인덱스를 이용해 idx번째 레코드만 읽는다."""
+    offsets = offsets if offsets is not None else load_index(path)
+    if not 0 <= idx < len(offsets) - 1:
+        raise IndexError(f"record index {idx} out of range for {path}")
+    with open(path, "rb") as f:
+        f.seek(offsets[idx])
+        return _decode(f.read(offsets[idx + 1] - offsets[idx]), is_compressed(path))
+
+
+def write_records(records, path):
+    """레코드 전체를 임시 파일에 기록한 뒤 교체(atomic)하고 offset 인덱스를 함께 생성"""
+    if not is_jsonl(path):
+        with _atomic_write(path, "w", encoding="utf-8") as f:
+            json.dump(list(records), f, ensure_ascii=False, indent=4)
+        return
+
+    compressed = is_compressed(path)
+    offsets = array("Q", [0])
+    with _atomic_write(path) as f:
+        for record in records:
+            data = _encode(record, compressed)
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    _write_index(str(path) + INDEX_SUFFIX, offsets)
+
+
+def append_records(path, records):
+    """
+    레코드를 파일 끝에 추가
+
+    파일 잠금(flock) 아래에서 한 번의 write로 기록하므로 여러 프로세스가 동시에 추가해도
+    레코드가 섞이거나 잘리지 않으며, offset 인덱스도 같은 잠금 안에서 새 offset만 이어 붙인다.
+    (인덱스의 마지막 offset이 파일 크기와 다를 때만 전체를 다시 생성)
+
+    Raises:
+        ValueError: .jsonl / .jsonl.zst가 아닌 경로 (.json 배열 파일에 줄을 이어 붙이면 파일이 깨짐)
+    """
+    if not is_jsonl(path):
+        raise ValueError(f"append_records supports only .jsonl and .jsonl.zst files: {path}")
+    compressed = is_compressed(path)
+    chunks = [_encode(record, compressed) for record in records]
+    if not chunks:
+        return
+
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        index_path = str(path) + INDEX_SUFFIX
+        size = os.path.getsize(path)
+        if size == 0:
+            _write_index(index_path, array("Q", [0]))
+        elif _index_tail(index_path) != size:
+            load_index(path)
+
+        os.write(fd, b"".join(chunks))
+        os.fsync(fd)
+        new_offsets = array("Q")
+        for chunk in chunks:
+            size += len(chunk)
+            new_offsets.append(size)
+        with open(index_path, "ab") as f:
+            f.write(new_offsets.tobytes())
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def append_record(path, record):
+    append_records(path, [record])
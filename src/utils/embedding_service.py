@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+from utils.llm_metrics import record_cache_hits
+from processors.rate_limiter import get_rate_limiter, estimate_tokens
+
+DEFAULT_EMBEDDING_CACHE_PATH = "../cache/embeddings.sqlite"
+
+# OpenAI embeddings API의 요청당 최대 입력 개수 / 토큰 수
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingService:
+    """
+    중복 제거 + 디스크 캐시 + API 크기 단위 배치 요청을 수행하는 임베딩 서비스
+
+    벡터는 (model, text hash)를 key로 SQLite에 float32 바이트로 저장되며,
+    캐시에 없는 고유 텍스트만 MAX_INPUTS_PER_REQUEST/MAX_TOKENS_PER_REQUEST 단위로 묶어 요청한다.
+    """
+
+    def __init__(self, client, model, cache_path=DEFAULT_EMBEDDING_CACHE_PATH, batch_size=MAX_INPUTS_PER_REQUEST):
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.client = client
+        self.model = model
+        self.batch_size = min(batch_size, MAX_INPUTS_PER_REQUEST)
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+
+    def _load_cached(self, hashes) -> dict:
+        cached = {}
+        with self._lock:
+            # SQLite 바인딩 변수 개수 제한을 피하기 위해 나누어 조회
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model, *chunk]
+                ).fetchall()
+                for h, blob in rows:
+                    cached[h] = np.frombuffer(blob, dtype=np.float32)
+        return cached
+
+    def _store(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model, h, np.asarray(vector, dtype=np.float32).tobytes()) for h, vector in items]
+            )
+
+    def _batches(self, texts):
+        """입력 개수와 추정 토큰 수 한도를 모두 지키도록 텍스트를 묶는다."""
+        batch, batch_tokens = [], 0
+        for text in texts:
+            tokens = estimate_tokens(text, self.model)
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > MAX_TOKENS_PER_REQUEST):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def _request(self, texts) -> list:
+        limiter = get_rate_limiter(self.model)
+        response = limiter.call(self.client.embeddings.with_raw_response.create, input=texts, model=self.model)
+        self.requests += 1
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def embed(self, texts) -> np.ndarray:
+        """
+        텍스트 리스트를 임베딩하여 입력 순서대로 (len(texts), dim) float32 배열로 반환
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        unique_texts = list(dict.fromkeys(texts))
+        hashes = {text: text_hash(text) for text in unique_texts}
+
+        vectors = self._load_cached(list(hashes.values()))
+        missing = [text for text in unique_texts if hashes[text] not in vectors]
+        self.hits += len(unique_texts) - len(missing)
+        self.misses += len(missing)
+        record_cache_hits("embedding", self.model, len(unique_texts) - len(missing))
+
+        for batch in self._batches(missing):
+            embedded = self._request(batch)
+            items = [(hashes[text], vector) for text, vector in zip(batch, embedded)]
+            self._store(items)
+            for h, vector in items:
+                vectors[h] = np.asarray(vector, dtype=np.float32)
+
+        return np.vstack([vectors[hashes[text]] for text in texts])
+
+
+_services = {}
+
+
+def get_embedding_service(client, model) -> EmbeddingService:
+    """client/model 조합별로 EmbeddingService를 재사용"""
+    key = (id(client), model)
+    if key not in _services:
+        _services[key] = EmbeddingService(client, model)
+    return _services[key]
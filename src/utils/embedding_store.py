@@ -0,0 +1,149 @@
+import os
+import json
+from collections import Counter
+
+import numpy as np
+
+from utils.embedding_service import text_hash
+
+VECTORS_FILE = "vectors.bin"
+INDEX_FILE = "index.json"
+
+
+class EmbeddingStore:
+    """
+    실행(run)별 임베딩을 디스크에 보관하는 memory-mapped 행렬 저장소
+
+    디렉토리 구성:
+        vectors.bin : (행 수, dim) row-major float32/float16 행렬
+        index.json  : {"dim", "dtype", "model", "keys": [[record, section, variant, iteration], ...], "hashes": [...]}
+                      keys[i]가 vectors.bin의 i번째 행에 해당하고, hashes[i]는 그 행을 만든 텍스트의 해시
+
+    Example:
+        store = EmbeddingStore("../result/prompt_ver1-30_samples_embeddings", dim=3072)
+        store.append([(0, "vision", "original", 1)], vectors, texts)
+        if store.matches(keys, texts):
+            vision = store.vectors(section="vision")
+    """
+
+    def __init__(self, path, dim=None, dtype="float32", model=None):
+        self.path = path
+        self._vectors_path = os.path.join(path, VECTORS_FILE)
+        self._index_path = os.path.join(path, INDEX_FILE)
+        self._matrix = None
+
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.dim = index["dim"]
+            self.dtype = np.dtype(index["dtype"])
+            self.model = index.get("model")
+            if model is not None and self.model is not None and model != self.model:
+                raise ValueError(f"Embedding store at {path} was built with {self.model}, not {model}")
+            self.keys = [tuple(key) for key in index["keys"]]
+            # 해시가 없는 이전 형식의 행은 어떤 텍스트와도 일치하지 않는 것으로 취급
+            self.hashes = index.get("hashes") or [None] * len(self.keys)
+        else:
+            if dim is None:
+                raise ValueError(f"Embedding store not found at {path}; dim is required to create one")
+            os.makedirs(path, exist_ok=True)
+            self.dim = dim
+            self.dtype = np.dtype(dtype)
+            self.model = model
+            self.keys = []
+            self.hashes = []
+            open(self._vectors_path, "wb").close()
+            self._write_index()
+
+        self.rows_by_key = {key: row for row, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return tuple(key) in self.rows_by_key
+
+    def _write_index(self):
+        # 중간에 중단되어도 기존 인덱스가 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype.name, "model": self.model, "keys": self.keys,
+                       "hashes": self.hashes}, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """전체 임베딩 행렬 (읽기 전용 memmap)"""
+        if self._matrix is None or len(self._matrix) != len(self.keys):
+            if not self.keys:
+                return np.empty((0, self.dim), dtype=self.dtype)
+            self._matrix = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(len(self.keys), self.dim))
+        return self._matrix
+
+    def matches(self, keys, texts) -> bool:
+        """모든 key가 저장되어 있고, 저장된 행이 같은 텍스트로 만들어졌는지 여부"""
+        for key, text in zip(keys, texts):
+            row = self.rows_by_key.get(tuple(key))
+            if row is None or self.hashes[row] != text_hash(text):
+                return False
+        return True
+
+    def append(self, keys, vectors, texts):
+        """
+        (record, section, variant, iteration) key와 벡터, 원본 텍스트를 추가. 이미 있는 key는 해당 행을 덮어쓴다.
+
+        Raises:
+            ValueError: keys 안에 중복된 key가 있을 때 (서로 다른 응답이 한 행을 나눠 쓰게 됨)
+        """
+        keys = [tuple(key) for key in keys]
+        duplicates = [key for key, count in Counter(keys).items() if count > 1]
+        if duplicates:
+            duplicates = duplicates[:5]
+            raise ValueError(f"Duplicate embedding store keys: {duplicates}")
+        vectors = np.asarray(vectors, dtype=self.dtype).reshape(len(keys), self.dim)
+        hashes = [text_hash(text) for text in texts]
+
+        existing = [(self.rows_by_key[key], vector, h) for key, vector, h in zip(keys, vectors, hashes)
+                    if key in self.rows_by_key]
+        new = [(key, vector, h) for key, vector, h in zip(keys, vectors, hashes) if key not in self.rows_by_key]
+
+        if existing:
+            self._matrix = None
+            matrix = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(len(self.keys), self.dim))
+            for row, vector, h in existing:
+                matrix[row] = vector
+                self.hashes[row] = h
+            matrix.flush()
+            del matrix
+
+        if new:
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.stack([vector for _, vector, _ in new]).tobytes())
+            for key, _, h in new:
+                self.rows_by_key[key] = len(self.keys)
+                self.keys.append(key)
+                self.hashes.append(h)
+            self._matrix = None
+
+        self._write_index()
+
+    def rows(self, record=None, section=None, variant=None, iteration=None) -> np.ndarray:
+        """조건에 맞는 행 번호 배열 (None인 조건은 무시)"""
+        conditions = (record, section, variant, iteration)
+        return np.array([
+            row for row, key in enumerate(self.keys)
+            if all(condition is None or value == condition for value, condition in zip(key, conditions))
+        ], dtype=np.int64)
+
+    def vectors(self, record=None, section=None, variant=None, iteration=None) -> np.ndarray:
+        """조건에 맞는 임베딩 행렬. 연속된 행이면 복사 없이 memmap view를 반환"""
+        rows = self.rows(record, section, variant, iteration)
+        if len(rows) == 0:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        if rows[-1] - rows[0] + 1 == len(rows):
+            return self.matrix[rows[0]:rows[-1] + 1]
+        return self.matrix[rows]
+
+    def get(self, keys) -> np.ndarray:
+        """key 리스트 순서대로 임베딩 행렬 반환"""
+        return self.matrix[[self.rows_by_key[tuple(key)] for key in keys]]
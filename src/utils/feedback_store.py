@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from utils.dataset_io import write_records
+
+DEFAULT_FEEDBACK_DB = "../data/feedback_results.sqlite"
+
+
+class FeedbackStore:
+    """
+    리뷰 피드백을 (index, reviewer) 단위로 저장하는 SQLite(WAL) 저장소
+
+    WAL 모드와 busy_timeout으로 여러 리뷰어(프로세스/스레드)가 동시에 저장해도 서로의 기록을 덮어쓰지 않으며,
+    제출마다 파일 전체를 다시 쓰는 대신 해당 행만 upsert한다.
+
+    Args:
+        path (str): SQLite 파일 경로
+        legacy_json (str): 기존 feedback_results.json 경로. 저장소가 비어 있으면 최초 1회 가져온다.
+    """
+
+    def __init__(self, path=DEFAULT_FEEDBACK_DB, legacy_json=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feedback (
+                idx INTEGER NOT NULL,
+                reviewer TEXT NOT NULL DEFAULT '',
+                selected_option TEXT NOT NULL,
+                feedback TEXT NOT NULL DEFAULT '',
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (idx, reviewer)
+            )
+            """
+        )
+
+        if legacy_json and os.path.exists(legacy_json) and len(self) == 0:
+            self.import_json(legacy_json)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+    def upsert(self, idx, selected_option, feedback, reviewer=""):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO feedback (idx, reviewer, selected_option, feedback, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (idx, reviewer) DO UPDATE SET
+                    selected_option = excluded.selected_option,
+                    feedback = excluded.feedback,
+                    updated_at = excluded.updated_at
+                """,
+                (idx, reviewer, selected_option, feedback, time.time())
+            )
+
+    def get(self, idx, reviewer=""):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT idx, reviewer, selected_option, feedback FROM feedback WHERE idx = ? AND reviewer = ?",
+                (idx, reviewer)
+            ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def entries(self, reviewer=None) -> list:
+        query = "SELECT idx, reviewer, selected_option, feedback FROM feedback"
+        params = ()
+        if reviewer is not None:
+            query += " WHERE reviewer = ?"
+            params = (reviewer,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY idx, reviewer", params).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    @staticmethod
+    def _to_entry(row):
+        # 기존 feedback_results.json 항목 형식 + reviewer
+        idx, reviewer, selected_option, feedback = row
+        return {"index": idx, "selected_option": selected_option, "feedback": feedback, "reviewer": reviewer}
+
+    def import_json(self, file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for entry in data if isinstance(data, list) else []:
+            self.upsert(entry["index"], entry["selected_option"], entry.get("feedback", ""),
+                        entry.get("reviewer", ""))
+
+    def export_json(self, file_path, reviewer=None):
+        """기존 feedback_results.json과 같은 JSON 배열 형식으로 내보내기"""
+        write_records(self.entries(reviewer), file_path)
@@ -1,16 +1,135 @@
-import json
+import os
+import io
+import hashlib
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-def load_data(uploaded_file):
-    """업로드된 파일을 pandas DataFrame으로 변환"""
+from utils.dataset_io import iter_records, write_records
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+PARQUET_CACHE_DIR = "../data/.parquet_cache"
+SUPPORTED_EXTENSIONS = ("csv", "xlsx", "parquet", "json", "jsonl")
+
+
+def get_extension(file_name):
+    """파일명에 점이 여러 개 있어도 마지막 확장자만 소문자로 반환"""
+    return os.path.splitext(os.path.basename(file_name))[1].lstrip('.').lower()
+
+
+def _read_excel(source):
+    """python-calamine이 설치되어 있으면 사용하고, 없으면 openpyxl 기반 pd.read_excel 사용"""
+    if CalamineWorkbook is None:
+        return pd.read_excel(source)
+
+    if isinstance(source, (str, os.PathLike)):
+        workbook = CalamineWorkbook.from_path(str(source))
+    else:
+        workbook = CalamineWorkbook.from_filelike(source)
+    rows = workbook.get_sheet_by_index(0).to_python()
+    if not rows:
+        return pd.DataFrame()
+
+    # 빈 셀은 ''로 읽히므로 pd.read_excel과 같이 NaN으로 바꾼 뒤 타입을 다시 추론
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    return df.replace('', np.nan).infer_objects()
+
+
+def optimize_dtypes(df, category_ratio=0.5, max_categories=1000):
+    """
+    메모리를 줄이기 위한 dtype 압축
+
+    - 정수 컬럼(결측 없이 정수값만 있는 실수 컬럼 포함)은 가장 작은 정수형으로 downcast
+    - 고유값 비율이 낮은 문자열 컬럼(예: 본사/현업)은 category로 변환
+    - 통계값이 달라지지 않도록 실수 컬럼의 정밀도는 유지
+    """
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            if len(series) and series.notna().all() and (series % 1 == 0).all():
+                df[column] = pd.to_numeric(series.astype(np.int64), downcast='integer')
+        elif series.dtype == object and len(series):
+            if not series.map(lambda value: isinstance(value, str) or pd.isna(value)).all():
+                continue
+            num_unique = series.nunique(dropna=True)
+            if num_unique <= max_categories and num_unique / len(series) <= category_ratio:
+                df[column] = series.astype('category')
+    return df
+
+
+def _read_by_extension(source, extension):
+    if extension == "csv":
+        return pd.read_csv(source)
+    elif extension == "xlsx":
+        return _read_excel(source)
+    elif extension == "parquet":
+        return pd.read_parquet(source)
+    elif extension == "json":
+        return pd.read_json(source)
+    elif extension == "jsonl":
+        return pd.read_json(source, lines=True)
+    raise ValueError(f"지원하지 않는 파일 형식입니다: {extension}")
+
+
+def _source_key(source):
+    """parquet sidecar key: 업로드 파일은 내용 해시, 경로는 (절대경로, 크기, 수정시각) 해시"""
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        payload = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")
+    else:
+        payload = source.getvalue()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def load_data(uploaded_file, content_hash=None):
+    """
+    업로드된 파일(또는 파일 경로)을 pandas DataFrame으로 변환
+
+    CSV/XLSX/Parquet/JSON(L)을 지원하며, 읽은 결과는 dtype을 압축한 뒤
+    PARQUET_CACHE_DIR에 parquet sidecar로 저장해 같은 파일을 다시 읽을 때 재사용한다.
+
+    Args:
+        uploaded_file: streamlit UploadedFile 또는 파일 경로
+        content_hash (str): 호출 측에서 이미 계산한 파일 내용 해시 (없으면 직접 계산)
+    """
     if uploaded_file is not None:
         try:
-            extension = uploaded_file.name.split('/')[-1].split('.')[1]
-            if extension == "csv":
-                df = pd.read_csv(uploaded_file)
-            elif extension == "xlsx":
-                df = pd.read_excel(uploaded_file)
+            name = uploaded_file if isinstance(uploaded_file, (str, os.PathLike)) else uploaded_file.name
+            extension = get_extension(str(name))
+            if extension not in SUPPORTED_EXTENSIONS:
+                raise ValueError(f"지원하지 않는 파일 형식입니다: {extension}")
+
+            sidecar_path = None
+            if extension != "parquet":
+                sidecar_key = content_hash or _source_key(uploaded_file)
+                sidecar_path = os.path.join(PARQUET_CACHE_DIR, f"{sidecar_key}.parquet")
+                if os.path.exists(sidecar_path):
+                    try:
+                        return pd.read_parquet(sidecar_path)
+                    except Exception as e:
+                        print(f"Ignoring unreadable parquet cache {sidecar_path}: {e}")
+
+            source = uploaded_file
+            if not isinstance(uploaded_file, (str, os.PathLike)):
+                source = io.BytesIO(uploaded_file.getvalue())
+            df = optimize_dtypes(_read_by_extension(source, extension))
+
+            if sidecar_path is not None:
+                try:
+                    os.makedirs(PARQUET_CACHE_DIR, exist_ok=True)
+                    df.to_parquet(sidecar_path + ".tmp", index=False)
+                    os.replace(sidecar_path + ".tmp", sidecar_path)
+                except Exception as e:
+                    # pyarrow 미설치, 혼합 타입 컬럼 등으로 저장할 수 없으면 sidecar 없이 진행
+                    print(f"Parquet cache not written for {name}: {e}")
+                    if os.path.exists(sidecar_path + ".tmp"):
+                        os.remove(sidecar_path + ".tmp")
 
             return df
         except Exception as e:
@@ -19,37 +138,16 @@ def load_data(uploaded_file):
 
 
 def load_json(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    return data
+    # .jsonl / .jsonl.zst 데이터셋도 같은 함수로 읽을 수 있다.
+    return list(iter_records(file_path))
 
 
 def save_to_json_file(data, file_name):
     try:
-        with open(file_name, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        # 확장자에 따라 JSON 배열 또는 JSONL(.jsonl, .jsonl.zst)로 저장 (임시 파일 기록 후 교체)
+        write_records(data, file_name)
         print(f"Data successfully saved to {file_name}")
         
     except Exception as e:
         print(f"Error saving data to {file_name}: {e}")
 
-
-def save_feedback(file_path, feedback_data):
-    try:
-        with open(file_path, "w") as f:
-            json.dump(feedback_data, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        st.error(f"Error saving feedback: {e}")
-
-
-def load_feedback(file_path):
-    try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data  # JSON 배열 반환
-            else:
-                return []  # 올바른 구조가 아니면 빈 배열 반환
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []  # 파일이 없거나 구조가 잘못된 경우 빈 배열 반환
\ No newline at end of file
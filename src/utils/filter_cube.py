@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from utils.group_stats import numeric_frame
+from utils.kde import DEFAULT_GRID_SIZE, linear_bin, scott_bandwidth, smooth_binned
+
+
+class FilterCube:
+    """
+    이산 필터 차원 조합(cell)별로 미리 집계해 둔 값 컬럼 통계
+
+    cell마다 컬럼별 count / 합 / 제곱합 / 최소 / 최대와 KDE용 linear binning 히스토그램을 저장하므로,
+    필터 조합이 바뀌어도 행을 다시 훑지 않고 선택된 cell들을 더하는 것만으로
+    그룹별 평균·표준편차와 KDE를 계산할 수 있다.
+
+    Args:
+        df (pd.DataFrame): 원본 데이터
+        dims (list): 필터/그룹 차원 컬럼들 (값 종류가 적은 이산 컬럼)
+        columns (list): 통계를 낼 값 컬럼들
+        grid_size (int): KDE 히스토그램 grid 크기
+        cut (float): grid를 전체 범위 밖으로 넓힐 폭 (전체 표준편차 배수)
+    """
+
+    def __init__(self, df, dims, columns, grid_size=DEFAULT_GRID_SIZE, cut=3):
+        self.dims = list(dims)
+        self.columns = list(columns)
+
+        # NaN도 isin() 필터와 같게 하나의 값으로 취급 (등장 순서 = unique() 순서)
+        codes = []
+        self.levels = {}
+        for dim in self.dims:
+            dim_codes, uniques = pd.factorize(df[dim], sort=False, use_na_sentinel=False)
+            codes.append(dim_codes)
+            self.levels[dim] = pd.Index(uniques)
+        self.cells, inverse = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        n_cells = len(self.cells)
+
+        values = numeric_frame(df, self.columns).to_numpy(dtype=np.float64)
+        finite = np.isfinite(values)
+        self.shift = np.nan_to_num(np.nanmean(np.where(finite, values, np.nan), axis=0))
+        centered = np.where(finite, values - self.shift, 0.0)
+
+        self.rows = np.bincount(inverse, minlength=n_cells)
+        self.count = np.zeros((n_cells, len(self.columns)))
+        self.sum = np.zeros((n_cells, len(self.columns)))
+        self.square = np.zeros((n_cells, len(self.columns)))
+        self.minimum = np.full((n_cells, len(self.columns)), np.inf)
+        self.maximum = np.full((n_cells, len(self.columns)), -np.inf)
+        np.add.at(self.count, inverse, finite)
+        np.add.at(self.sum, inverse, centered)
+        np.add.at(self.square, inverse, centered ** 2)
+        np.minimum.at(self.minimum, inverse, np.where(finite, values, np.inf))
+        np.maximum.at(self.maximum, inverse, np.where(finite, values, -np.inf))
+
+        # 컬럼별 고정 grid 위의 cell별 히스토그램 (linear binning은 cell끼리 더할 수 있음)
+        self.grids = np.zeros((len(self.columns), grid_size))
+        self.hist = np.zeros((n_cells, len(self.columns), grid_size))
+        for position in range(len(self.columns)):
+            column_values = values[finite[:, position], position]
+            if len(column_values) == 0:
+                self.grids[position] = np.linspace(0.0, 1.0, grid_size)
+                continue
+            margin = cut * column_values.std() or 1.0
+            grid = np.linspace(column_values.min() - margin, column_values.max() + margin, grid_size)
+            self.grids[position] = grid
+            self.hist[:, position] = linear_bin(column_values, inverse[finite[:, position]], n_cells, grid)
+
+    def cell_mask(self, filters) -> np.ndarray:
+        """
+        {dim: 허용 값 목록} 필터에 해당하는 cell mask. 지정하지 않은 차원은 전체 허용
+        (df[dim].isin(values)를 모두 &로 묶은 것과 같은 행들)
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, allowed in filters.items():
+            position = self.dims.index(dim)
+            allowed_codes = np.flatnonzero(self.levels[dim].isin(list(allowed)))
+            mask &= np.isin(self.cells[:, position], allowed_codes)
+        return mask
+
+    def _group(self, mask, by):
+        # 선택된 cell들을 by 차원 값별로 합산할 때 쓸 (그룹 code, 그룹 수)
+        position = self.dims.index(by)
+        return self.cells[mask, position], len(self.levels[by])
+
+    def stats(self, mask, by, columns=None, ddof=1) -> pd.DataFrame:
+        """
+        선택된 cell들의 by 차원별 count / mean / std
+
+        Returns:
+            pd.DataFrame: group_stats와 같은 (column, stat) MultiIndex 컬럼. by 값 기준 정렬, NaN 그룹 제외
+        """
+        columns = list(columns or self.columns)
+        positions = [self.columns.index(column) for column in columns]
+        group_codes, n_groups = self._group(mask, by)
+
+        def total(array):
+            result = np.zeros((n_groups,) + array.shape[1:])
+            np.add.at(result, group_codes, array[mask])
+            return result
+
+        rows = total(self.rows)
+        counts = total(self.count[:, positions])
+        sums = total(self.sum[:, positions])
+        squares = total(self.square[:, positions])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = sums / counts + self.shift[positions]
+            variance = (squares - sums ** 2 / counts) / (counts - ddof)
+        std = np.where(counts > ddof, np.sqrt(np.clip(variance, 0, None)), np.nan)
+
+        pieces = {"count": counts, "mean": mean, "std": std}
+        result = pd.DataFrame(
+            np.stack([pieces[stat] for stat in pieces], axis=2).reshape(n_groups, -1),
+            index=self.levels[by],
+            columns=pd.MultiIndex.from_product([columns, list(pieces)])
+        )
+        result.index.name = by
+        keep = (rows > 0) & result.index.notna()
+        return result[keep].sort_index()
+
+    def kde(self, mask, by, column):
+        """
+        선택된 cell들의 by 차원별 KDE (Scott's rule bandwidth, 그룹 범위 ± 3 * bandwidth)
+
+        Returns:
+            tuple: (grid, densities (n_groups, grid_size), labels). 선택된 행이 없는 그룹은 제외
+        """
+        position = self.columns.index(column)
+        group_codes, n_groups = self._group(mask, by)
+
+        binned = np.zeros((n_groups, self.grids.shape[1]))
+        np.add.at(binned, group_codes, self.hist[mask, position])
+        counts = np.zeros(n_groups)
+        sums = np.zeros(n_groups)
+        squares = np.zeros(n_groups)
+        minimums = np.full(n_groups, np.inf)
+        maximums = np.full(n_groups, -np.inf)
+        np.add.at(counts, group_codes, self.count[mask, position])
+        np.add.at(sums, group_codes, self.sum[mask, position])
+        np.add.at(squares, group_codes, self.square[mask, position])
+        np.minimum.at(minimums, group_codes, self.minimum[mask, position])
+        np.maximum.at(maximums, group_codes, self.maximum[mask, position])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variances = (squares - sums ** 2 / counts) / (counts - 1)
+        bandwidths = scott_bandwidth(counts, variances)
+        lower = minimums - 3 * np.nan_to_num(bandwidths)
+        upper = maximums + 3 * np.nan_to_num(bandwidths)
+
+        grid = self.grids[position]
+        densities = smooth_binned(binned, grid, bandwidths, lower, upper)
+        present = np.zeros(n_groups, dtype=bool)
+        present[group_codes] = True
+        present &= np.asarray(self.levels[by].notna())
+        labels = list(self.levels[by])
+        return grid, densities[present], [labels[i] for i in np.flatnonzero(present)]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+TOTAL_LABEL = "전체"
+
+
+def numeric_frame(df, columns) -> pd.DataFrame:
+    values = df[columns]
+    non_numeric = [column for column in columns if not pd.api.types.is_numeric_dtype(values[column])]
+    if non_numeric:
+        values = values.assign(**{column: pd.to_numeric(values[column], errors="coerce") for column in non_numeric})
+    return values
+
+
+def _quantile_label(q) -> str:
+    return f"{q * 100:g}%"
+
+
+def group_stats(df, keys, columns, quantiles=(), ddof=1, sort=True, total_label=TOTAL_LABEL) -> pd.DataFrame:
+    """
+    여러 그룹 key × 여러 컬럼의 count / mean / std (/ quantile)를 한 번의 groupby로 계산
+
+    컬럼마다 groupby를 반복하는 대신, 그룹별 count·합·제곱합을 한 번에 구한 뒤 평균과 표준편차를 계산한다.
+    (제곱합의 상쇄 오차를 줄이기 위해 전체 평균만큼 이동한 값으로 계산)
+
+    Args:
+        keys (str | list): 그룹 컬럼(들). 비어 있으면 전체를 한 행(total_label)으로 계산
+        columns (list): 통계를 낼 컬럼들. 숫자형이 아닌 값은 NaN으로 취급
+        quantiles (tuple): 추가로 계산할 분위수 (예: (0.25, 0.5, 0.75))
+        ddof (int): 표준편차 자유도 (pandas std 기본값 1)
+        sort (bool): 그룹 정렬 여부. False면 등장 순서
+
+    Returns:
+        pd.DataFrame: index는 그룹, columns는 (column, stat) MultiIndex.
+            stat은 count, mean, std, 그리고 분위수별 "25%" 형식. NaN key 그룹은 제외
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    columns = list(columns)
+
+    values = numeric_frame(df, columns)
+    shift = values.mean().fillna(0.0)
+    centered = values - shift
+    by = [df[key] for key in keys] if keys else np.zeros(len(df), dtype=np.int8)
+
+    parts = pd.concat({"count": centered.notna(), "sum": centered, "square": centered ** 2}, axis=1)
+    totals = parts.groupby(by, sort=sort, observed=True).sum()
+
+    counts = totals["count"]
+    sums = totals["sum"]
+    mean = sums / counts + shift
+    variance = (totals["square"] - sums ** 2 / counts) / (counts - ddof)
+    std = np.sqrt(variance.clip(lower=0)).where(counts > ddof)
+    pieces = {"count": counts, "mean": mean, "std": std}
+
+    if quantiles:
+        quantiles = list(quantiles)
+        grouped = values.groupby(by, sort=sort, observed=True).quantile(quantiles)
+        grouped = grouped.unstack(-1).reindex(totals.index)
+        for q in quantiles:
+            pieces[_quantile_label(q)] = grouped.xs(q, axis=1, level=-1)
+
+    result = pd.concat(pieces, axis=1).swaplevel(0, 1, axis=1)
+    result = result.reindex(columns=pd.MultiIndex.from_product([columns, list(pieces)]))
+    if not keys:
+        result.index = [total_label]
+    return result
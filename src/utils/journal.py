@@ -0,0 +1,122 @@
+import os
+import json
+import threading
+
+
+class RunJournal:
+    """
+    완료된 (record, section, variant, iteration) 결과를 즉시 기록하는 append-only JSONL 저널
+
+    각 줄은 {"idx", "section", "variant", "iteration", "key", "response"} 형태이며,
+    재시작 시 load()로 이미 완료된 작업을 복원하여 다시 요청하지 않도록 한다.
+    key는 요청(model, messages, temperature ...)의 해시로, prompt나 입력 레코드가 바뀐 작업은
+    같은 (idx, section, variant, iteration)이라도 재사용하지 않는다.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self.repair()
+
+    def repair(self):
+        """
+        기록 도중 중단되어 줄바꿈 없이 잘린 마지막 줄을 잘라낸다.
+
+        잘린 줄 뒤에 새 기록이 이어 붙으면 두 줄이 함께 깨지므로 저널을 열 때 한 번 호출된다.
+        """
+        if not os.path.exists(self.path):
+            return
+        with self._lock, open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            # 마지막 줄바꿈 위치를 뒤에서부터 찾는다.
+            end = size
+            while end > 0:
+                start = max(0, end - 64 * 1024)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+            print(f"Journal : dropped a torn final line ({size - end} bytes) from {self.path}")
+
+    def load(self) -> dict:
+        """
+        저널을 읽어 완료된 작업을 반환. 읽을 수 없는 줄은 건너뛰며 파일은 수정하지 않는다.
+
+        Returns:
+            dict: {(idx, section, variant, iteration): (key, response)}. key가 없는 이전 형식은 None
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+
+        skipped = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    job = (entry["idx"], entry["section"], entry["variant"], entry["iteration"])
+                    completed[job] = (entry.get("key"), entry["response"])
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+
+        if skipped:
+            print(f"Journal : {skipped} unreadable line(s) skipped in {self.path}")
+        return completed
+
+    def load_valid(self, request_keys) -> dict:
+        """
+        요청 key가 현재와 같은 작업만 반환
+
+        Args:
+            request_keys (dict): {job: 현재 요청 key}. 여기에 없는 작업은 무시
+        Returns:
+            dict: {job: response}
+        """
+        valid = {}
+        stale = 0
+        for job, (key, response) in self.load().items():
+            if job not in request_keys:
+                continue
+            if key == request_keys[job]:
+                valid[job] = response
+            else:
+                stale += 1
+        if stale:
+            print(f"Journal : {stale} stale result(s) ignored (prompt or input changed)")
+        return valid
+
+    def append(self, job, response, key):
+        """
+        Args:
+            key (str): 요청 key (CompletionCache.make_key 값)
+        """
+        idx, section, variant, iteration = job
+        line = json.dumps({
+            "idx": idx,
+            "section": section,
+            "variant": variant,
+            "iteration": iteration,
+            "key": key,
+            "response": response
+        }, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
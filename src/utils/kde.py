@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_GRID_SIZE = 512
+DEFAULT_MAX_GROUPS = 12
+OTHER_LABEL = "기타"
+
+
+def group_codes(series, max_groups=DEFAULT_MAX_GROUPS, other_label=OTHER_LABEL):
+    """
+    그룹 컬럼을 한 번만 factorize하여 (codes, labels) 반환
+
+    labels 순서는 series.unique()와 같은 등장 순서이며, NaN은 code -1로 제외된다.
+    그룹 수가 max_groups를 넘으면 빈도 상위 max_groups - 1개만 남기고 나머지는 other_label 하나로 묶는다.
+    """
+    codes, uniques = pd.factorize(series, sort=False)
+    labels = [str(value) for value in uniques]
+    if max_groups is None or len(labels) <= max_groups:
+        return codes, labels
+
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    keep = np.sort(np.argsort(-counts, kind="stable")[:max_groups - 1])
+
+    remap = np.full(len(labels), len(keep), dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+    codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+    return codes, [labels[i] for i in keep] + [other_label]
+
+
+def binned_kde(values, codes, n_groups, grid_size=DEFAULT_GRID_SIZE, cut=3):
+    """
+    그룹별 Gaussian KDE를 linear binning + FFT convolution으로 한 번에 계산
+
+    bandwidth는 그룹마다 Scott's rule(std * n^(-1/5), seaborn/scipy 기본값)을 사용하고,
+    각 곡선은 seaborn처럼 그룹 데이터 범위 ± cut * bandwidth 밖에서는 NaN으로 둔다.
+    표본이 2개 미만이거나 분산이 0인 그룹은 전부 NaN (seaborn도 해당 곡선을 그리지 않음)
+
+    Returns:
+        tuple: (grid (grid_size,), densities (n_groups, grid_size))
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes)
+    valid = (codes >= 0) & np.isfinite(values)
+    values, codes = values[valid], codes[valid]
+
+    grid = np.linspace(0.0, 1.0, grid_size)
+    densities = np.full((n_groups, grid_size), np.nan)
+    if len(values) == 0:
+        return grid, densities
+
+    counts = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+        deviations = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+        variances = deviations / (counts - 1)
+    bandwidths = scott_bandwidth(counts, variances)
+    usable = np.isfinite(bandwidths)
+    if not usable.any():
+        return grid, densities
+
+    minimums = np.full(n_groups, np.inf)
+    maximums = np.full(n_groups, -np.inf)
+    np.minimum.at(minimums, codes, values)
+    np.maximum.at(maximums, codes, values)
+    lower = np.where(usable, minimums - cut * bandwidths, np.inf)
+    upper = np.where(usable, maximums + cut * bandwidths, -np.inf)
+    grid = np.linspace(lower.min(), upper.max(), grid_size)
+
+    binned = linear_bin(values, codes, n_groups, grid)
+    return grid, smooth_binned(binned, grid, bandwidths, lower, upper)
+
+
+def linear_bin(values, codes, n_groups, grid) -> np.ndarray:
+    """
+    linear binning: 각 값을 양옆 grid 점에 거리 비례로 나눠 담은 (n_groups, len(grid)) 배열
+
+    결과는 값에 대해 선형이므로, 부분 집합별 binning 결과를 더하면 합집합의 binning 결과와 같다.
+    grid 밖의 값은 양 끝 구간에 담긴다.
+    """
+    grid_size = len(grid)
+    step = grid[1] - grid[0]
+    position = (np.asarray(values, dtype=np.float64) - grid[0]) / step
+    left = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    weight = np.clip(position - left, 0.0, 1.0)
+    binned = np.zeros((n_groups, grid_size))
+    np.add.at(binned, (codes, left), 1.0 - weight)
+    np.add.at(binned, (codes, left + 1), weight)
+    return binned
+
+
+def scott_bandwidth(counts, variances) -> np.ndarray:
+    """Scott's rule (std * n^(-1/5)). 표본이 2개 미만이거나 분산이 0이면 NaN"""
+    counts = np.asarray(counts, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bandwidths = np.sqrt(np.clip(variances, 0, None)) * counts ** (-1 / 5)
+    return np.where((counts >= 2) & (bandwidths > 0), bandwidths, np.nan)
+
+
+def smooth_binned(binned, grid, bandwidths, lower=None, upper=None) -> np.ndarray:
+    """
+    binning된 그룹별 빈도를 그룹별 bandwidth의 Gaussian과 FFT로 convolution하여 밀도로 변환
+
+    bandwidth가 NaN인 그룹과 [lower, upper] 밖의 grid 점은 NaN
+    """
+    n_groups, grid_size = binned.shape
+    step = grid[1] - grid[0]
+    bandwidths = np.asarray(bandwidths, dtype=np.float64)
+    usable = np.isfinite(bandwidths) & (bandwidths > 0)
+    counts = binned.sum(axis=1)
+
+    # 원형 convolution이 양 끝을 넘어가지 않도록 2배 길이로 padding하고,
+    # Gaussian kernel은 Fourier 변환의 닫힌 형태를 그룹별 bandwidth로 바로 사용
+    size = 2 * grid_size
+    frequencies = np.fft.rfftfreq(size, d=step)
+    safe_bandwidths = np.where(usable, bandwidths, 1.0)
+    kernels = np.exp(-0.5 * (2 * np.pi * frequencies[None, :] * safe_bandwidths[:, None]) ** 2)
+    smoothed = np.fft.irfft(np.fft.rfft(binned, n=size, axis=1) * kernels, n=size, axis=1)[:, :grid_size]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.clip(smoothed, 0, None) / (counts[:, None] * step)
+    # in-place &=로 [lower, upper] 조건을 더할 수 있도록 처음부터 (n_groups, grid_size) 크기로 만든다.
+    mask = np.repeat((usable & (counts > 0))[:, None], grid_size, axis=1)
+    if lower is not None:
+        mask &= grid[None, :] >= np.asarray(lower)[:, None]
+    if upper is not None:
+        mask &= grid[None, :] <= np.asarray(upper)[:, None]
+    return np.where(mask, result, np.nan)
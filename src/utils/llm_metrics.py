@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+import contextvars
+from contextlib import contextmanager
+
+import pandas as pd
+
+DEFAULT_METRICS_PATH = "../cache/llm_metrics.sqlite"
+
+# USD / 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "text-embedding-3-large": (0.13, 0.13, 0.0),
+    "text-embedding-3-small": (0.02, 0.02, 0.0),
+    "text-embedding-ada-002": (0.10, 0.10, 0.0),
+}
+# Batch API는 동기 요청 가격의 50%
+BATCH_DISCOUNT = 0.5
+
+# 호출 지점에서 지정하는 분류 라벨 (asyncio task에는 자동 전파, 스레드에는 copy_context로 전달)
+_labels = contextvars.ContextVar("llm_metric_labels", default={})
+
+
+@contextmanager
+def metric_labels(**labels):
+    """
+    블록 안에서 발생한 LLM 호출에 prompt_version / section / variant 라벨을 붙인다.
+
+    예: with metric_labels(prompt_version="v1", section="vision"): ...
+    """
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0, batch=False) -> float:
+    """토큰 사용량의 예상 비용(USD). 가격표에 없는 모델은 0"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # gpt-4o-2024-08-06 처럼 날짜가 붙은 모델명은 가장 긴 접두사로 찾는다.
+        matches = [name for name in MODEL_PRICES if model.startswith(name)]
+        if not matches:
+            return 0.0
+        prices = MODEL_PRICES[max(matches, key=len)]
+
+    input_price, cached_price, output_price = prices
+    cached_tokens = cached_tokens or 0
+    cost = ((prompt_tokens or 0) - cached_tokens) * input_price + cached_tokens * cached_price \
+        + (completion_tokens or 0) * output_price
+    cost /= 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def usage_tokens(usage) -> tuple:
+    """OpenAI usage 객체/dict에서 (prompt, cached, completion) 토큰 수 추출"""
+    if usage is None:
+        return None, None, None
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details") or {}
+        return usage.get("prompt_tokens"), details.get("cached_tokens"), usage.get("completion_tokens")
+    details = getattr(usage, "prompt_tokens_details", None)
+    return (getattr(usage, "prompt_tokens", None), getattr(details, "cached_tokens", None),
+            getattr(usage, "completion_tokens", None))
+
+
+INSERT_CALL = """
+INSERT INTO llm_calls (created_at, kind, model, prompt_version, section, variant, cache_hit, ok, requests,
+                       prompt_tokens, cached_tokens, completion_tokens, latency, elapsed, retries, cost)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class MetricsStore:
+    """
+    LLM 호출 단위의 토큰 / 지연 시간 / 재시도 / 캐시 적중 / 예상 비용을 기록하는 SQLite(WAL) 저장소
+
+    Args:
+        path (str): SQLite 파일 경로
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                kind TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL DEFAULT '',
+                section TEXT NOT NULL DEFAULT '',
+                variant TEXT NOT NULL DEFAULT '',
+                cache_hit INTEGER NOT NULL DEFAULT 0,
+                ok INTEGER NOT NULL DEFAULT 1,
+                requests INTEGER NOT NULL DEFAULT 1,
+                prompt_tokens INTEGER,
+                cached_tokens INTEGER,
+                completion_tokens INTEGER,
+                latency REAL,
+                elapsed REAL,
+                retries INTEGER NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    def record(self, kind, model, *, cache_hit=False, ok=True, requests=1, usage=None, latency=None, elapsed=None,
+               retries=0, batch=False, **labels):
+        """
+        호출 한 건 기록. 라벨을 직접 주지 않으면 metric_labels()로 지정된 값을 사용
+
+        Args:
+            kind (str): chat / embedding / batch
+            requests (int): 실제 API 요청 수 (캐시 적중은 0)
+            latency (float): 성공한 요청의 응답 시간(초)
+            elapsed (float): rate limit 대기와 재시도를 포함한 전체 시간(초)
+        """
+        row = self._row(kind, model, cache_hit=cache_hit, ok=ok, requests=requests, usage=usage, latency=latency,
+                        elapsed=elapsed, retries=retries, batch=batch, **labels)
+        with self._lock:
+            self._conn.execute(INSERT_CALL, row)
+
+    def record_cache_hit(self, kind, model, count=1, **labels):
+        """캐시 적중 count건을 한 transaction에서 기록 (건마다 commit하지 않음)"""
+        if count <= 0:
+            return
+        row = self._row(kind, model, cache_hit=True, **labels)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(INSERT_CALL, [row] * count)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _row(kind, model, *, cache_hit=False, ok=True, requests=1, usage=None, latency=None, elapsed=None,
+             retries=0, batch=False, **labels) -> tuple:
+        labels = {**_labels.get(), **labels}
+        prompt_tokens, cached_tokens, completion_tokens = usage_tokens(usage)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens, batch=batch)
+        return (time.time(), kind, model, str(labels.get("prompt_version", "")), str(labels.get("section", "")),
+                str(labels.get("variant", "")), int(cache_hit), int(ok), 0 if cache_hit else requests,
+                prompt_tokens, cached_tokens, completion_tokens, latency, elapsed, retries, cost)
+
+    def frame(self, since=None) -> pd.DataFrame:
+        query = "SELECT * FROM llm_calls"
+        params = ()
+        if since is not None:
+            query += " WHERE created_at >= ?"
+            params = (since,)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def report(self, since=None, by=("prompt_version", "section", "model")) -> pd.DataFrame:
+        """
+        (prompt version, section, model)별 요약
+
+        calls / cache_hit_rate / requests / 토큰 합계 / latency p50·p95·p99 / 재시도 / 실패 / 예상 비용
+        """
+        df = self.frame(since)
+        if df.empty:
+            return pd.DataFrame()
+
+        by = list(by)
+        grouped = df.groupby(by, sort=True)
+        summary = grouped.agg(
+            calls=("id", "size"),
+            cache_hits=("cache_hit", "sum"),
+            requests=("requests", "sum"),
+            failures=("ok", lambda ok: int((ok == 0).sum())),
+            prompt_tokens=("prompt_tokens", "sum"),
+            cached_tokens=("cached_tokens", "sum"),
+            completion_tokens=("completion_tokens", "sum"),
+            retries=("retries", "sum"),
+            cost_usd=("cost", "sum"),
+        )
+        summary["cache_hit_rate"] = summary["cache_hits"] / summary["calls"]
+
+        timed = df[df["latency"].notna()]
+        for name, q in (("latency_p50", 0.5), ("latency_p95", 0.95), ("latency_p99", 0.99)):
+            summary[name] = timed.groupby(by, sort=True)["latency"].quantile(q) if not timed.empty else float("nan")
+        return summary.reset_index()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_metrics_store() -> MetricsStore:
+    """프로세스 전체에서 공유하는 기본 저장소. LLM_METRICS_PATH로 경로 변경, 'off'이면 기록하지 않음"""
+    global _default_store
+    path = os.getenv("LLM_METRICS_PATH", DEFAULT_METRICS_PATH)
+    if path == "off":
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MetricsStore(path)
+        return _default_store
+
+
+def record_call(kind, model, **kwargs):
+    """기본 저장소에 호출 기록 (기록 실패가 실제 LLM 호출을 막지 않도록 예외는 무시)"""
+    try:
+        store = get_metrics_store()
+        if store is not None:
+            store.record(kind, model, **kwargs)
+    except sqlite3.Error as e:
+        print(f"LLM metrics 기록 실패: {e}")
+
+
+def record_cache_hits(kind, model, count=1):
+    try:
+        store = get_metrics_store()
+        if store is not None and count:
+            store.record_cache_hit(kind, model, count)
+    except sqlite3.Error as e:
+        print(f"LLM metrics 기록 실패: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLM 호출 토큰 / 비용 / 지연 시간 요약")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="(prompt version, section, model)별 요약 출력")
+    report_parser.add_argument("--db", default=os.getenv("LLM_METRICS_PATH", DEFAULT_METRICS_PATH))
+    report_parser.add_argument("--days", type=float, default=None, help="최근 N일만 집계")
+    report_parser.add_argument("--by", default="prompt_version,section,model", help="쉼표로 구분한 그룹 컬럼")
+    report_parser.add_argument("--csv", default=None, help="요약을 CSV로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"metrics 파일이 없습니다: {args.db}")
+        return 1
+
+    since = time.time() - args.days * 86400 if args.days is not None else None
+    summary = MetricsStore(args.db).report(since=since, by=args.by.split(","))
+    if summary.empty:
+        print("기록된 호출이 없습니다.")
+        return 0
+
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(summary.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+        totals = summary[["calls", "requests", "prompt_tokens", "completion_tokens", "cost_usd"]].sum()
+        print(f"\nTotal : {int(totals['calls'])} calls, {int(totals['requests'])} requests, "
+              f"{int(totals['prompt_tokens'])} prompt / {int(totals['completion_tokens'])} completion tokens, "
+              f"${totals['cost_usd']:.4f}")
+    if args.csv:
+        summary.to_csv(args.csv, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
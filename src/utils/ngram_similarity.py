@@ -0,0 +1,196 @@
+from itertools import combinations
+
+import numpy as np
+from scipy import sparse
+
+# MinHash 해시 함수 h(x) = (a * x + b) mod p 에 사용하는 메르센 소수
+MERSENNE_PRIME = (1 << 31) - 1
+# MinHash 시그니처 계산 시 한 번에 만드는 해시 수 (int64 기준 약 128MB)
+HASH_BLOCK_SIZE = 1 << 24
+
+
+def tokenize_responses(responses) -> list:
+    """각 응답을 한 번만 토큰화하고, 단어를 정수 ID로 변환"""
+    vocab = {}
+    return [[vocab.setdefault(word, len(vocab)) for word in text.split()] for text in responses]
+
+
+def ngram_matrix(token_ids, n) -> sparse.csr_matrix:
+    """
+    응답별 n-gram 집합을 (응답 수, n-gram 수) 이진 희소 행렬로 변환
+
+    n-gram(단어 ID 튜플)은 등장 순서대로 정수 ID를 부여받으므로 해시 충돌이 없다.
+    """
+    ngram_ids = {}
+    indptr = [0]
+    indices = []
+    for ids in token_ids:
+        row = {ngram_ids.setdefault(tuple(ids[i:i + n]), len(ngram_ids)) for i in range(len(ids) - n + 1)}
+        indices.extend(sorted(row))
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(token_ids), len(ngram_ids)))
+
+
+def jaccard_matrix(matrix: sparse.csr_matrix) -> np.ndarray:
+    """이진 희소 행렬의 모든 행 쌍에 대한 Jaccard 유사도 (합집합이 비어 있으면 0)"""
+    intersection = (matrix @ matrix.T).toarray().astype(np.float64)
+    sizes = np.asarray(matrix.sum(axis=1)).ravel().astype(np.float64)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def minhash_signatures(matrix: sparse.csr_matrix, num_perm=128, seed=42, block_size=HASH_BLOCK_SIZE) -> np.ndarray:
+    """
+    각 행의 n-gram 집합에 대한 MinHash 시그니처 (응답 수, num_perm)
+
+    (num_perm, n-gram 등장 수) 해시 행렬 전체를 만들지 않도록 행과 permutation을 나누어
+    한 번에 최대 block_size개의 해시만 계산한다.
+    n-gram이 없는 행은 모든 값이 MERSENNE_PRIME인 시그니처를 갖는다.
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.int64)
+    b = rng.randint(0, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.int64)
+
+    num_rows = matrix.shape[0]
+    signatures = np.full((num_rows, num_perm), MERSENNE_PRIME, dtype=np.int64)
+    indptr = matrix.indptr
+    nnz_budget = max(1, block_size // num_perm)
+
+    start = 0
+    while start < num_rows:
+        # n-gram 수가 nnz_budget을 넘지 않는 범위까지 행을 묶는다 (최소 1행)
+        stop = max(start + 1, int(np.searchsorted(indptr, indptr[start] + nnz_budget, side="right")) - 1)
+        stop = min(stop, num_rows)
+        rows = np.arange(start, stop)
+        rows = rows[indptr[rows + 1] > indptr[rows]]
+        if len(rows):
+            base = indptr[rows[0]]
+            indices = matrix.indices[base:indptr[rows[-1] + 1]].astype(np.int64)
+            offsets = indptr[rows] - base
+            perm_step = max(1, block_size // len(indices))
+            for perm in range(0, num_perm, perm_step):
+                hashes = (a[perm:perm + perm_step] * indices[None, :] + b[perm:perm + perm_step]) % MERSENNE_PRIME
+                signatures[rows, perm:perm + perm_step] = np.minimum.reduceat(hashes, offsets, axis=1).T
+        start = stop
+
+    return signatures
+
+
+def lsh_candidate_pairs(signatures, bands=32, max_bucket_size=32, max_pairs=None) -> set:
+    """
+    MinHash 시그니처를 band 단위로 버킷팅하여 유사할 가능성이 높은 (i, j) 쌍(i < j)을 반환
+
+    band 하나라도 전부 일치하는 쌍만 후보가 되므로, Jaccard가 약 (1 / bands) ** (1 / rows_per_band)
+    이상인 쌍이 주로 선택된다. 후보 수가 N²으로 커지지 않도록 max_bucket_size보다 큰 버킷은 건너뛰고,
+    후보가 max_pairs개를 넘으면 남은 band는 보지 않는다.
+    """
+    num_rows, num_perm = signatures.shape
+    rows_per_band = max(1, num_perm // bands)
+    candidates = set()
+    for start in range(0, num_perm - rows_per_band + 1, rows_per_band):
+        buckets = {}
+        band_signatures = np.ascontiguousarray(signatures[:, start:start + rows_per_band])
+        for idx, key in enumerate(map(bytes, band_signatures)):
+            buckets.setdefault(key, []).append(idx)
+        for members in buckets.values():
+            if 1 < len(members) <= max_bucket_size:
+                candidates.update(combinations(members, 2))
+        if max_pairs is not None and len(candidates) >= max_pairs:
+            break
+    return candidates
+
+
+def minhash_mean_similarity(signatures, empty_rows, bands=32, num_samples=10_000, seed=42,
+                            max_pairs_per_row=16) -> float:
+    """
+    MinHash 시그니처로 추정한 모든 쌍(i < j)의 평균 Jaccard 유사도
+
+    N² 쌍을 모두 비교하지 않고 다음 세 부분의 합으로 추정한다.
+    - 시그니처가 완전히 같은 응답들: 같은 시그니처끼리 묶어 쌍 수만 계산 (추정값 1)
+    - LSH 후보 쌍: 서로 다른 시그니처 사이의 후보 쌍만 시그니처로 비교 (최대 시그니처 수 × max_pairs_per_row개)
+    - 나머지 쌍: num_samples개를 무작위로 뽑아 평균을 구하고 나머지 쌍 수를 곱함
+    따라서 비용은 O(N + 후보 수 + num_samples)이며 N²에 비례하지 않는다.
+    n-gram이 없는 응답이 포함된 쌍은 0으로 취급한다.
+    """
+    num_rows = signatures.shape[0]
+    if num_rows < 2:
+        return float("nan")
+    total_pairs = num_rows * (num_rows - 1) / 2
+
+    valid = np.flatnonzero(~empty_rows)
+    row_groups = np.full(num_rows, -1, dtype=np.int64)
+    if len(valid):
+        uniques, inverse, weights = np.unique(signatures[valid], axis=0, return_inverse=True, return_counts=True)
+        row_groups[valid] = inverse.reshape(-1)
+        weights = weights.astype(np.float64)
+    else:
+        uniques, weights = signatures[:0], np.zeros(0)
+
+    total = float((weights * (weights - 1) / 2).sum())
+    covered = total
+
+    candidates = lsh_candidate_pairs(uniques, bands=bands, max_pairs=max_pairs_per_row * len(uniques))
+    if candidates:
+        pairs = np.array(sorted(candidates), dtype=np.int64)
+        left, right = pairs[:, 0], pairs[:, 1]
+        estimates = (uniques[left] == uniques[right]).mean(axis=1)
+        pair_weights = weights[left] * weights[right]
+        total += float((estimates * pair_weights).sum())
+        covered += float(pair_weights.sum())
+
+    remaining = total_pairs - covered
+    if remaining > 0 and num_samples:
+        rng = np.random.RandomState(seed)
+        first = rng.randint(0, num_rows, size=num_samples)
+        second = (first + rng.randint(1, num_rows, size=num_samples)) % num_rows
+        first_groups, second_groups = row_groups[first], row_groups[second]
+
+        # 이미 계산한 쌍(같은 시그니처 / LSH 후보)에 해당하는 표본은 제외
+        keep = np.array([
+            a < 0 or b < 0 or (a != b and (min(a, b), max(a, b)) not in candidates)
+            for a, b in zip(first_groups.tolist(), second_groups.tolist())
+        ], dtype=bool)
+        if keep.any():
+            estimates = (signatures[first[keep]] == signatures[second[keep]]).mean(axis=1)
+            estimates[(first_groups[keep] < 0) | (second_groups[keep] < 0)] = 0
+            total += remaining * float(estimates.mean())
+
+    return float(total / total_pairs)
+
+
+def ngram_similarity(responses, num_gram, method="exact", num_perm=128, seed=42):
+    """
+    n = 1..num_gram 에 대해 응답 쌍별 n-gram Jaccard 유사도 계산
+
+    Args:
+        responses (list): 응답 문자열 리스트
+        num_gram (int): 최대 n
+        method (str): "exact"는 희소 행렬 연산으로 정확히 계산,
+                      "minhash"는 MinHash 시그니처로 근사 (응답 수가 매우 클 때)
+    Returns:
+        tuple: (n별 평균 유사도 리스트, n별 쌍별 유사도 행렬 리스트)
+               minhash 모드에서는 행렬 대신 n별 시그니처 리스트를 반환
+    """
+    token_ids = tokenize_responses(responses)
+    num_responses = len(responses)
+
+    means, matrices = [], []
+    for n in range(1, num_gram + 1):
+        matrix = ngram_matrix(token_ids, n)
+
+        if method == "exact":
+            similarities = jaccard_matrix(matrix)
+            upper = np.triu_indices(num_responses, k=1)
+            means.append(float(similarities[upper].mean()) if num_responses > 1 else float("nan"))
+            matrices.append(similarities)
+        elif method == "minhash":
+            signatures = minhash_signatures(matrix, num_perm=num_perm, seed=seed)
+            empty_rows = np.diff(matrix.indptr) == 0
+            means.append(minhash_mean_similarity(signatures, empty_rows, seed=seed))
+            matrices.append(signatures)
+        else:
+            raise ValueError(f"Unknown n-gram similarity method: {method}")
+
+    return means, matrices
@@ -0,0 +1,65 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.dataset_io import is_jsonl, iter_records, load_index, read_record, write_records
+
+
+def jsonl_sidecar(path) -> str:
+    """
+    단일 JSON 배열 파일을 레코드 단위로 읽을 수 있도록 .jsonl sidecar로 변환하여 경로 반환
+
+    원본이 sidecar보다 새로우면 다시 변환한다. (원본 전체를 읽는 것은 변환할 때 한 번뿐)
+    변환은 고유한 임시 파일에 기록한 뒤 교체하므로 여러 세션이 동시에 변환해도 덜 쓰인 파일이 보이지 않는다.
+    """
+    if is_jsonl(path):
+        return path
+
+    sidecar = path + ".jsonl"
+    if not os.path.exists(sidecar) or os.path.getmtime(sidecar) < os.path.getmtime(path):
+        write_records(iter_records(path), sidecar)
+    return sidecar
+
+
+class RecordStore:
+    """
+    offset 인덱스로 필요한 레코드만 읽는 lazy 레코드 저장소
+
+    최근 읽은 cache_size개의 레코드를 LRU로 보관하고,
+    prefetch()로 다음 레코드들을 백그라운드 스레드에서 미리 읽어 둘 수 있다.
+    """
+
+    def __init__(self, path, cache_size=64):
+        self.path = jsonl_sidecar(path)
+        self.offsets = load_index(self.path)
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        with self._lock:
+            if idx in self._cache:
+                self._cache.move_to_end(idx)
+                return self._cache[idx]
+
+        record = read_record(self.path, idx, self.offsets)
+        with self._lock:
+            self._cache[idx] = record
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def prefetch(self, indices):
+        """범위를 벗어나지 않는 인덱스들을 백그라운드에서 미리 읽어 캐시에 넣는다."""
+        for idx in indices:
+            if 0 <= idx < len(self):
+                with self._lock:
+                    cached = idx in self._cache
+                if not cached:
+                    self._executor.submit(self.__getitem__, idx)
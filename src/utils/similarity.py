@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_SIZE = 4096
+
+
+def normalize_rows(embeddings) -> np.ndarray:
+    """행 단위 L2 정규화 (norm이 0인 행은 0 벡터로 유지, sklearn cosine_similarity와 동일)"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def _normalized_sum(embeddings, block_size=DEFAULT_BLOCK_SIZE):
+    """정규화된 벡터의 합과 0이 아닌 행 수를 block 단위로 계산 (memmap 입력도 전체를 올리지 않음)"""
+    total = np.zeros(embeddings.shape[1], dtype=np.float64)
+    non_zero = 0
+    for start in range(0, len(embeddings), block_size):
+        block = normalize_rows(embeddings[start:start + block_size])
+        total += block.sum(axis=0, dtype=np.float64)
+        non_zero += int(np.count_nonzero(np.any(block != 0, axis=1)))
+    return total, non_zero
+
+
+def mean_pairwise_cosine(embeddings, include_self=True, block_size=DEFAULT_BLOCK_SIZE) -> float:
+    """
+    N x N 유사도 행렬 없이 평균 코사인 유사도를 계산
+
+    정규화 벡터 u_i의 합 s에 대해 sum_{i,j} u_i·u_j = s·s 이므로
+    - include_self=True : s·s / N^2                    (cosine_similarity(X).mean()과 동일)
+    - include_self=False: (s·s - N) / (N * (N - 1))    (자기 자신과의 쌍 제외)
+    """
+    num_rows = len(embeddings)
+    if num_rows == 0:
+        return float("nan")
+
+    total, non_zero = _normalized_sum(embeddings, block_size)
+    squared = float(total @ total)
+
+    if include_self:
+        return squared / num_rows ** 2
+    if num_rows < 2:
+        return float("nan")
+    return (squared - non_zero) / (num_rows * (num_rows - 1))
+
+
+def topk_similar(queries, corpus, k=10, block_size=DEFAULT_BLOCK_SIZE, exclude_self=False):
+    """
+    queries 각 행에 대해 corpus에서 코사인 유사도 상위 k개를 block 단위로 탐색
+
+    메모리 사용량은 (query 수 x block_size)로 제한된다.
+
+    Args:
+        exclude_self (bool): queries와 corpus가 같은 행렬일 때 자기 자신(i == j)을 제외
+    Returns:
+        tuple: (indices, scores) 각각 (query 수, k) 배열, 유사도 내림차순
+    """
+    queries = normalize_rows(queries)
+    num_queries = len(queries)
+    k = min(k, len(corpus) - (1 if exclude_self else 0))
+
+    best_scores = np.full((num_queries, k), -np.inf, dtype=np.float32)
+    best_indices = np.full((num_queries, k), -1, dtype=np.int64)
+
+    for start in range(0, len(corpus), block_size):
+        block = normalize_rows(corpus[start:start + block_size])
+        scores = queries @ block.T
+        if exclude_self:
+            rows = np.arange(num_queries)
+            in_block = (rows >= start) & (rows < start + len(block))
+            scores[rows[in_block], rows[in_block] - start] = -np.inf
+
+        block_indices = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_indices = np.concatenate([best_indices, block_indices], axis=1)
+
+        top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, top, axis=1)
+        best_indices = np.take_along_axis(merged_indices, top, axis=1)
+
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_indices, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def group_similarity_stats(embeddings, labels, block_size=DEFAULT_BLOCK_SIZE) -> pd.DataFrame:
+    """
+    그룹 간/그룹 내 평균 코사인 유사도 행렬
+
+    그룹별 정규화 벡터 합 S_g만 누적하므로 메모리는 (그룹 수 x dim)이다.
+    대각 성분(그룹 내 평균)은 자기 자신과의 쌍을 제외한 값이다.
+
+    Returns:
+        pd.DataFrame: index/columns가 그룹 라벨인 평균 유사도 행렬
+    """
+    codes, groups = pd.factorize(pd.Series(labels), sort=True)
+    num_groups = len(groups)
+
+    sums = np.zeros((num_groups, embeddings.shape[1]), dtype=np.float64)
+    counts = np.bincount(codes, minlength=num_groups).astype(np.float64)
+    non_zero = np.zeros(num_groups, dtype=np.float64)
+    for start in range(0, len(embeddings), block_size):
+        block = normalize_rows(embeddings[start:start + block_size])
+        block_codes = codes[start:start + block_size]
+        np.add.at(sums, block_codes, block)
+        non_zero += np.bincount(block_codes, weights=np.any(block != 0, axis=1), minlength=num_groups)
+
+    dots = sums @ sums.T
+    pair_counts = np.outer(counts, counts)
+
+    # 그룹 내 평균은 자기 자신과의 쌍(i == j)을 제외
+    diagonal = np.diag_indices(num_groups)
+    dots[diagonal] -= non_zero
+    pair_counts[diagonal] = counts * (counts - 1)
+
+    means = np.divide(dots, pair_counts, out=np.full_like(dots, np.nan), where=pair_counts > 0)
+    return pd.DataFrame(means, index=groups, columns=groups)
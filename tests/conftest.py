@@ -0,0 +1,35 @@
+import os
+import sys
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+
+# src/ 모듈은 "utils.xxx" 형태로 서로 import하므로 src를 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+@pytest.fixture
+def serve_app():
+    """aiohttp Application을 별도 스레드의 event loop에서 띄우고 base URL(http://127.0.0.1:port)을 반환"""
+    servers = []
+
+    def serve(app):
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        servers.append((loop, runner, thread))
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    yield serve
+
+    for loop, runner, thread in servers:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")
+
+# processors.openai_processor가 import 시점에 client를 만들므로 더미 key 지정
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from utils import calculates
+from funcs.analysis import analyze_result_file, default_store_path
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        rng = np.random.default_rng(len(texts))
+        return rng.normal(size=(len(texts), 8)).astype(np.float32)
+
+
+def test_analysis_reuses_the_default_embedding_store(tmp_path, monkeypatch):
+    service = FakeEmbeddingService()
+    monkeypatch.setattr(calculates, "get_embedding_service", lambda client, model: service)
+    result_path = str(tmp_path / "prompt_ver1-2_samples.csv")
+    pd.DataFrame({
+        "iteration": [1, 2] * 3,
+        "response": [f"{kind} 응답 {i}" for kind in ("vision", "workstyle", "summary") for i in range(2)],
+        "type": ["vision", "vision", "workstyle", "workstyle", "summary", "summary"],
+    }).to_csv(result_path, index=False)
+    monkeypatch.setattr(calculates, "plot_embeddings_tsne", lambda analysis_results, save_path=None: None)
+
+    first = analyze_result_file(result_path, client=None, ng_gram=2)
+    second = analyze_result_file(result_path, client=None, ng_gram=2)
+
+    assert os.path.isdir(default_store_path(result_path))
+    assert service.calls == 1
+    assert second["vision"]["semantic_similarity"] == first["vision"]["semantic_similarity"]
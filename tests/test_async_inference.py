@@ -0,0 +1,116 @@
+import os
+import time
+import asyncio
+from collections import Counter
+
+import openai
+import pytest
+from aiohttp import web
+
+# processors.openai_processor가 import 시점에 client를 만들므로 더미 key 지정
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from utils.journal import RunJournal
+from funcs import async_inference
+from funcs.async_inference import SECTION_PROMPTS, run_inference
+
+SECTIONS = ("vision", "workstyle", "summary")
+MODEL = "stub-model"
+
+
+class StubChatApi:
+    """
+    /v1/chat/completions 대역. 응답은 user 메시지를 그대로 돌려준다.
+
+    throttle개의 요청은 먼저 429(Retry-After: 0)로 거절하고, user 메시지에 reject가 들어간 요청은 400을 반환한다.
+    정상 응답은 delay초 뒤에 보내므로 거절 시점에 다른 요청이 진행 중이게 할 수 있다.
+    """
+
+    def __init__(self):
+        self.throttle = 0
+        self.reject = None
+        self.delay = 0
+        self.completed = Counter()
+
+    async def handle(self, request):
+        body = await request.json()
+        user_input = body["messages"][-1]["content"]
+        if self.throttle > 0:
+            self.throttle -= 1
+            return web.json_response({"error": {"message": "Rate limit reached", "type": "requests"}}, status=429,
+                                     headers={"retry-after": "0"})
+        if self.reject and self.reject in user_input:
+            return web.json_response({"error": {"message": "invalid input", "type": "invalid_request_error"}},
+                                     status=400)
+
+        await asyncio.sleep(self.delay)
+        self.completed[(body["messages"][0]["content"], user_input)] += 1
+        return web.json_response({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"echo {user_input}"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+
+@pytest.fixture
+def stub(serve_app, tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_METRICS_PATH", "off")
+    # 실제 프롬프트 대신 짧은 문자열로 바꿔 rate limiter의 토큰 예산 안에서 바로 처리되게 한다.
+    for section in SECTIONS:
+        for variant in SECTION_PROMPTS[section]:
+            monkeypatch.setitem(SECTION_PROMPTS[section], variant, f"{section} {variant} prompt")
+    monkeypatch.setattr(async_inference, "build_batch_inputs",
+                        lambda dataset: [{section: f"{section} {record}" for section in SECTIONS}
+                                         for record in dataset])
+
+    api = StubChatApi()
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", api.handle)
+    base_url = serve_app(app) + "/v1"
+
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    def run(dataset):
+        client = openai.AsyncOpenAI(api_key="test", base_url=base_url, max_retries=0)
+        return asyncio.run(run_inference(dataset, client, max_concurrency=8, model=MODEL, cache=False,
+                                         journal=RunJournal(journal_path)))
+
+    return api, run, journal_path
+
+
+def test_retries_rate_limited_requests(stub):
+    api, run, _ = stub
+    api.throttle = 2
+
+    results = run(["record 0", "record 1"])
+
+    assert api.throttle == 0
+    assert sum(api.completed.values()) == 2 * 3 * 2
+    assert results["workstyle"][1]["advanced"] == [{"iteration": 1, "response": "echo workstyle record 1"}]
+
+
+def test_resumes_from_journal_after_failure(stub):
+    api, run, journal_path = stub
+    dataset = ["record 0", "record 1", "record 2"]
+    api.reject = "workstyle record 1"
+    api.delay = 0.05
+
+    with pytest.raises(openai.BadRequestError):
+        run(dataset)
+    journaled = len(RunJournal(journal_path).load())
+    assert journaled > 0
+
+    # 취소된 요청의 서버 측 처리가 끝난 뒤 집계를 초기화
+    time.sleep(5 * api.delay)
+    api.reject = None
+    api.completed.clear()
+    results = run(dataset)
+
+    # 저널에 기록된 작업은 다시 요청하지 않는다.
+    assert sum(api.completed.values()) == 3 * 3 * 2 - journaled
+    assert all(results[section][idx][variant] for section in SECTIONS for idx in range(3)
+               for variant in ("original", "advanced"))
@@ -0,0 +1,197 @@
+import os
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# processors.openai_processor가 import 시점에 client를 만들므로 더미 key 지정
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from utils.journal import RunJournal
+from funcs import batch_inference
+from funcs.batch_inference import parse_custom_id, run_batch_inference
+
+SECTIONS = ("vision", "workstyle", "summary")
+
+
+class FakeFiles:
+    def __init__(self):
+        self.contents = {}
+
+    def create(self, file, purpose):
+        file_id = f"file-{len(self.contents)}"
+        self.contents[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def add(self, text):
+        file_id = f"file-{len(self.contents)}"
+        self.contents[file_id] = text
+        return file_id
+
+    def content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+
+class FakeBatches:
+    """
+    제출된 요청 파일을 바로 처리하는 Batch API 대역
+
+    fail_ids의 custom_id는 오류 파일로, invalid=True면 검증 실패(결과 파일 없음)로 처리하고,
+    pending=True인 동안은 in_progress 상태를 반환한다.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.submitted = []
+        self.batches = {}
+        self.fail_ids = set()
+        self.invalid = False
+        self.pending = False
+
+    def create(self, input_file_id, endpoint, completion_window, metadata=None):
+        requests = [json.loads(line) for line in self.files.contents[input_file_id].splitlines() if line.strip()]
+        batch_id = f"batch-{len(self.submitted)}"
+        self.submitted.append([request["custom_id"] for request in requests])
+        self.batches[batch_id] = requests
+        return SimpleNamespace(id=batch_id)
+
+    def retrieve(self, batch_id):
+        counts = SimpleNamespace(completed=0, total=len(self.batches[batch_id]), failed=0)
+        if self.pending:
+            return SimpleNamespace(status="in_progress", request_counts=counts)
+        if self.invalid:
+            errors = SimpleNamespace(data=[SimpleNamespace(code="invalid_request", line=1,
+                                                           message="Model 'gpt-x' does not exist")])
+            return SimpleNamespace(status="failed", output_file_id=None, error_file_id=None, errors=errors,
+                                   request_counts=counts)
+
+        outputs, errors = [], []
+        for request in self.batches[batch_id]:
+            custom_id = request["custom_id"]
+            if custom_id in self.fail_ids:
+                errors.append({"custom_id": custom_id, "error": {"code": "server_error", "message": "boom"}})
+                continue
+            body = {
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": f"response {custom_id}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }
+            outputs.append({"custom_id": custom_id, "response": {"status_code": 200, "body": body}, "error": None})
+
+        to_jsonl = lambda entries: "".join(json.dumps(entry) + "\n" for entry in entries)
+        return SimpleNamespace(
+            status="completed",
+            output_file_id=self.files.add(to_jsonl(outputs)) if outputs else None,
+            error_file_id=self.files.add(to_jsonl(errors)) if errors else None,
+            errors=None,
+            request_counts=counts,
+        )
+
+
+class FakeClient:
+    def __init__(self):
+        self.files = FakeFiles()
+        self.batches = FakeBatches(self.files)
+
+    def with_options(self, **options):
+        return self
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_METRICS_PATH", "off")
+    # 레코드 전처리 대신 section별 입력 문자열을 바로 사용
+    # texts[idx]를 바꾸면 해당 레코드의 요청 key가 달라진다.
+    texts = ["input 0", "input 1"]
+    monkeypatch.setattr(batch_inference, "build_batch_inputs",
+                        lambda dataset: [{section: f"{section} {texts[idx]}" for section in SECTIONS}
+                                         for idx, _ in enumerate(dataset)])
+    client = FakeClient()
+
+    def run(**kwargs):
+        return run_batch_inference([{}, {}], client, n_iter=1, work_dir=str(tmp_path / "batch"), cache=False,
+                                   journal=RunJournal(str(tmp_path / "journal.jsonl")), poll_interval=0, **kwargs)
+
+    return client, run, tmp_path / "batch" / "batches.json", texts
+
+
+def test_submit_and_assemble(setup):
+    client, run, state_file, _ = setup
+
+    results = run()
+
+    assert len(client.batches.submitted) == 1
+    assert len(client.batches.submitted[0]) == 2 * 3 * 2  # record x section x variant
+    assert results["vision"][1]["advanced"] == [{"iteration": 1, "response": "response 1:vision:advanced:1"}]
+    assert not state_file.exists()
+
+    # 모두 저널에 있으므로 다시 제출하지 않는다.
+    run()
+    assert len(client.batches.submitted) == 1
+
+
+def test_resume_from_state_file(setup):
+    client, run, state_file, _ = setup
+    client.batches.pending = True
+
+    with pytest.raises(TimeoutError):
+        run(timeout=0)
+    assert state_file.exists()
+
+    client.batches.pending = False
+    results = run()
+
+    # 기존 batch를 이어서 기다리며 새로 제출하지 않는다.
+    assert len(client.batches.submitted) == 1
+    assert results["summary"][0]["original"][0]["response"] == "response 0:summary:original:1"
+    assert not state_file.exists()
+
+
+def test_failed_requests_are_resubmitted(setup):
+    client, run, _, _ = setup
+    client.batches.fail_ids = {"0:vision:original:1", "1:summary:advanced:1"}
+
+    results = run()
+    assert results["vision"][0]["original"] == []
+
+    client.batches.fail_ids = set()
+    results = run()
+
+    assert sorted(client.batches.submitted[1]) == ["0:vision:original:1", "1:summary:advanced:1"]
+    assert results["vision"][0]["original"] == [{"iteration": 1, "response": "response 0:vision:original:1"}]
+    assert parse_custom_id("1:summary:advanced:1") == (1, "summary", "advanced", 1)
+
+
+def test_rejected_batch_keeps_state(setup):
+    client, run, state_file, _ = setup
+    client.batches.invalid = True
+
+    with pytest.raises(RuntimeError, match="does not exist"):
+        run()
+    assert state_file.exists()
+
+    # 같은 입력을 다시 제출하지 않고 같은 오류를 보고한다.
+    with pytest.raises(RuntimeError, match="does not exist"):
+        run()
+    assert len(client.batches.submitted) == 1
+
+
+def test_resume_discards_changed_requests(setup):
+    client, run, state_file, texts = setup
+    client.batches.pending = True
+
+    with pytest.raises(TimeoutError):
+        run(timeout=0)
+
+    # 제출 이후 0번 레코드의 입력이 바뀌면 기존 결과를 새 key로 기록하지 않는다.
+    texts[0] = "changed input 0"
+    client.batches.pending = False
+    results = run()
+
+    assert results["vision"][0]["original"] == []
+    assert results["vision"][1]["original"][0]["response"] == "response 1:vision:original:1"
+    assert not state_file.exists()
+
+    results = run()
+    assert sorted(client.batches.submitted[1]) == sorted(f"0:{section}:{variant}:1" for section in SECTIONS
+                                                         for variant in ("original", "advanced"))
+    assert results["vision"][0]["original"][0]["response"] == "response 0:vision:original:1"
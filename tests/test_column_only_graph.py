@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from funcs.column_only_graph import count_summary
+
+
+def test_integer_bins_hold_the_same_number_of_values():
+    counts = count_summary(pd.Series(np.arange(90) % 45), top_k=30, bins=20)
+
+    assert counts.index[:3].tolist() == ["0–2", "3–5", "6–8"]
+    assert (counts == 6).all()
+    assert counts.sum() == 90
+
+
+def test_float_bins_keep_interval_labels():
+    counts = count_summary(pd.Series(np.linspace(0, 1, 100)), top_k=30, bins=20)
+
+    assert counts.index[0] == "[0, 0.05)"
+    assert counts.index[-1].endswith("]")
+    assert counts.sum() == 100
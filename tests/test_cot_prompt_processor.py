@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+
+from processors.cot_prompt_processor import _sample_choices
+
+
+class FakeLimiter:
+    def call(self, raw_create, **kwargs):
+        return raw_create(**kwargs)
+
+
+class FakeClient:
+    """n개를 요청받아도 최대 max_choices개의 choice만 반환하는 chat completions 대역"""
+
+    def __init__(self, max_choices):
+        self.max_choices = max_choices
+        self.requested = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create)))
+
+    def create(self, model, messages, temperature, n=1):
+        self.requested.append(n)
+        count = min(n, self.max_choices)
+        choices = [SimpleNamespace(index=i, finish_reason="stop", message=SimpleNamespace(content=f"sample {i}"))
+                   for i in reversed(range(count))]
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10 * count)
+        return SimpleNamespace(choices=choices, usage=usage)
+
+
+def test_shortfall_is_requested_again():
+    client = FakeClient(max_choices=3)
+
+    entries = _sample_choices(FakeLimiter(), client, "gpt-4o", [], 1.0, [1, 2, 3, 4, 5])
+
+    assert client.requested == [5, 2]
+    assert [entry["iteration"] for entry in entries] == [1, 2, 3, 4, 5]
+    # usage는 요청별 첫 choice에만 기록되므로 합계가 요청 usage의 합과 같다.
+    assert sum(entry["prompt_tokens"] for entry in entries) == 200
+    assert sum(entry["completion_tokens"] for entry in entries) == 30 + 20
+
+
+def test_missing_choices_raise():
+    with pytest.raises(RuntimeError, match="too few choices"):
+        _sample_choices(FakeLimiter(), FakeClient(max_choices=0), "gpt-4o", [], 1.0, [1, 2])
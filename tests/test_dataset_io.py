@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from utils.dataset_io import append_records, count_records, iter_records, read_record, write_records
+
+
+@pytest.mark.parametrize("name", ["data.jsonl", "data.jsonl.zst"])
+def test_append_extends_index(tmp_path, name):
+    if name.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / name)
+    write_records([{"idx": 0}], path)
+
+    append_records(path, [{"idx": 1}, {"idx": 2}])
+    append_records(path, [{"idx": 3}])
+
+    assert count_records(path) == 4
+    assert read_record(path, 2) == {"idx": 2}
+    assert [record["idx"] for record in iter_records(path)] == [0, 1, 2, 3]
+
+
+def test_append_rejects_json_array(tmp_path):
+    path = tmp_path / "data.json"
+    write_records([{"idx": 0}], str(path))
+
+    with pytest.raises(ValueError, match=".jsonl"):
+        append_records(str(path), [{"idx": 1}])
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"idx": 0}]
@@ -0,0 +1,134 @@
+import json
+import uuid
+import asyncio
+import sqlite3
+from collections import Counter
+
+import pytest
+from aiohttp import web
+
+from utils.dataset_io import iter_records
+from funcs.db import fetch_results_async, sync_results
+
+
+class StubApi:
+    """
+    결과 조회 API 대역 (GET /tests/{testId}/ai-request)
+
+    results에 없는 id는 404, failures[id]에 남은 상태 코드가 있으면 그 코드를 먼저 반환하며,
+    delays[id]초 뒤에 응답한다.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.failures = {}
+        self.delays = {}
+        self.hits = Counter()
+
+    async def handle(self, request):
+        test_id = request.match_info["testId"]
+        self.hits[test_id] += 1
+        await asyncio.sleep(self.delays.get(test_id, 0))
+        if self.failures.get(test_id):
+            return web.Response(status=self.failures[test_id].pop(0), headers={"Retry-After": "0"})
+        if test_id not in self.results:
+            return web.Response(status=404, text="not found")
+        return web.json_response(self.results[test_id])
+
+
+@pytest.fixture
+def stub_api(serve_app):
+    api = StubApi()
+    app = web.Application()
+    app.router.add_get("/tests/{testId}/ai-request", api.handle)
+    api.base_url = serve_app(app) + "/tests/{testId}/ai-request"
+    return api
+
+
+class SQLitePool:
+    """getconn()/putconn()만 제공하는 psycopg2 커넥션 풀 대역"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def getconn(self):
+        return self.connection
+
+    def putconn(self, connection):
+        pass
+
+
+@pytest.fixture
+def pool():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE hr_culture_test (id TEXT, updated_at TEXT, auth_code TEXT)")
+    yield SQLitePool(connection)
+    connection.close()
+
+
+def add_tests(pool, api, count, updated_at="v1"):
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    for id_value in ids:
+        pool.connection.execute("INSERT INTO hr_culture_test VALUES (?, ?, 'code')", (id_value, updated_at))
+        api.results[id_value] = {"testId": id_value, "score": updated_at}
+    return sorted(ids)
+
+
+def test_fetch_retries_and_skips_fetched_ids(stub_api, tmp_path):
+    stream_file = str(tmp_path / "stream.jsonl")
+    ok, throttled, missing = (str(uuid.uuid4()) for _ in range(3))
+    stub_api.results = {ok: {"value": 1}, throttled: {"value": 2}}
+    stub_api.failures = {throttled: [429, 503]}
+
+    written = asyncio.run(fetch_results_async([ok, throttled, missing], stream_file, base_url=stub_api.base_url,
+                                              max_attempts=3))
+
+    assert written == 2
+    assert {entry["testId"]: entry["result"] for entry in iter_records(stream_file)} == stub_api.results
+    assert stub_api.hits == {ok: 1, throttled: 3, missing: 1}
+
+    # 이미 기록된 id는 다시 요청하지 않는다.
+    asyncio.run(fetch_results_async([ok, throttled], stream_file, base_url=stub_api.base_url))
+    assert stub_api.hits[ok] == 1 and stub_api.hits[throttled] == 3
+
+
+def test_sync_fetches_only_new_or_changed(stub_api, pool, tmp_path):
+    output_file = str(tmp_path / "result.json")
+    state_file = str(tmp_path / "state.json")
+    sync = lambda: sync_results("auth_code IS NOT NULL", output_file, state_file, updated_at_column="updated_at",
+                                pool=pool, base_url=stub_api.base_url)
+    ids = add_tests(pool, stub_api, 3)
+
+    assert sync() == 3
+    with open(output_file, encoding="utf-8") as f:
+        dataset = json.load(f)
+    assert dataset == [stub_api.results[id_value] for id_value in ids]
+
+    # 변경된 테스트 1건과 새 테스트 1건만 조회한다.
+    stub_api.hits.clear()
+    pool.connection.execute("UPDATE hr_culture_test SET updated_at = 'v2' WHERE id = ?", (ids[1],))
+    stub_api.results[ids[1]] = {"testId": ids[1], "score": "v2"}
+    new_id = add_tests(pool, stub_api, 1)[0]
+
+    assert sync() == 2
+    assert set(stub_api.hits) == {ids[1], new_id}
+    with open(output_file, encoding="utf-8") as f:
+        dataset = json.load(f)
+    assert dataset[1] == {"testId": ids[1], "score": "v2"}
+    assert dataset[3] == stub_api.results[new_id]
+
+
+def test_sync_appends_in_query_order(stub_api, pool, tmp_path):
+    output_file = str(tmp_path / "result.json")
+    state_file = str(tmp_path / "state.json")
+    ids = add_tests(pool, stub_api, 5)
+    # 앞선 id일수록 늦게 응답하도록 해 도착 순서를 뒤집는다.
+    stub_api.delays = {id_value: 0.05 * (len(ids) - position) for position, id_value in enumerate(ids)}
+
+    sync_results("auth_code IS NOT NULL", output_file, state_file, pool=pool, base_url=stub_api.base_url)
+
+    with open(output_file, encoding="utf-8") as f:
+        assert [data["testId"] for data in json.load(f)] == ids
+    with open(state_file, encoding="utf-8") as f:
+        state = json.load(f)
+    assert [state[id_value]["index"] for id_value in ids] == [0, 1, 2, 3, 4]
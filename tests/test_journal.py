@@ -0,0 +1,30 @@
+from utils.journal import RunJournal
+
+
+def test_corrupt_line_keeps_later_entries(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = RunJournal(str(path))
+    journal.append((0, "vision", "original", 1), "a", "key-a")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("{not json\n")
+    journal.append((1, "vision", "original", 1), "b", "key-b")
+    size = path.stat().st_size
+
+    completed = journal.load()
+
+    assert completed == {(0, "vision", "original", 1): ("key-a", "a"), (1, "vision", "original", 1): ("key-b", "b")}
+    # load()는 파일을 수정하지 않는다.
+    assert path.stat().st_size == size
+
+
+def test_open_trims_torn_final_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    RunJournal(str(path)).append((0, "summary", "advanced", 1), "a", "key-a")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"idx": 1, "section": "summ')
+
+    journal = RunJournal(str(path))
+    journal.append((1, "summary", "advanced", 1), "b", "key-b")
+
+    assert journal.load_valid({(0, "summary", "advanced", 1): "key-a", (1, "summary", "advanced", 1): "key-b"}) == {
+        (0, "summary", "advanced", 1): "a", (1, "summary", "advanced", 1): "b"}
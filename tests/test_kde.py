@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from utils.kde import binned_kde
+from utils.filter_cube import FilterCube
+
+
+def direct_kde(values, grid):
+    """Scott's rule bandwidth의 Gaussian KDE를 정의대로 계산"""
+    values = np.asarray(values, dtype=np.float64)
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    z = (grid[:, None] - values[None, :]) / bandwidth
+    return np.exp(-0.5 * z ** 2).sum(axis=1) / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+
+
+def test_binned_kde_matches_direct_kde_within_support():
+    rng = np.random.RandomState(0)
+    values = np.concatenate([rng.normal(0, 1, 400), rng.normal(5, 2, 300)])
+    codes = np.repeat([0, 1], [400, 300])
+
+    grid, densities = binned_kde(values, codes, 2, grid_size=1024)
+
+    assert densities.shape == (2, 1024)
+    for group in range(2):
+        group_values = values[codes == group]
+        inside = np.isfinite(densities[group])
+        assert inside.any()
+        # 그룹 범위 ± 3 * bandwidth 밖은 NaN
+        assert grid[inside].min() >= group_values.min() - 3 * group_values.std(ddof=1) - 1e-9
+        np.testing.assert_allclose(densities[group, inside], direct_kde(group_values, grid[inside]), atol=5e-3)
+
+
+def test_binned_kde_skips_degenerate_groups():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 7.0, 7.0, 9.0])
+    codes = np.array([0, 0, 0, 0, 1, 1, 2])
+
+    _, densities = binned_kde(values, codes, 3)
+
+    assert np.isfinite(densities[0]).any()
+    assert np.isnan(densities[1]).all()  # 분산 0
+    assert np.isnan(densities[2]).all()  # 표본 1개
+
+
+def test_filter_cube_kde_matches_binned_kde():
+    rng = np.random.RandomState(1)
+    df = pd.DataFrame({
+        "연령대": rng.choice(["20대", "30대", "40대"], size=600),
+        "성별": rng.choice(["남", "여"], size=600),
+        "score": rng.normal(50, 10, size=600),
+    })
+    cube = FilterCube(df, ["연령대", "성별"], ["score"], grid_size=256)
+
+    grid, densities, labels = cube.kde(cube.cell_mask({"성별": ["여"]}), "연령대", "score")
+
+    selected = df[df["성별"] == "여"]
+    assert labels == list(pd.unique(df["연령대"]))
+    assert densities.shape == (len(labels), len(grid))
+    for label, density in zip(labels, densities):
+        group_values = selected.loc[selected["연령대"] == label, "score"].to_numpy()
+        inside = np.isfinite(density)
+        assert inside.any()
+        assert grid[inside].min() >= group_values.min() - 3 * group_values.std(ddof=1)
+        assert grid[inside].max() <= group_values.max() + 3 * group_values.std(ddof=1)
+        np.testing.assert_allclose(density[inside], direct_kde(group_values, grid[inside]), atol=5e-3)
@@ -0,0 +1,14 @@
+import numpy as np
+
+from utils.ngram_similarity import minhash_signatures, ngram_matrix, tokenize_responses
+
+
+def test_minhash_signatures_do_not_depend_on_block_size():
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(50)]
+    responses = [" ".join(rng.choice(words, size=rng.integers(0, 30))) for _ in range(200)]
+    matrix = ngram_matrix(tokenize_responses(responses), 2)
+
+    expected = minhash_signatures(matrix, num_perm=64, block_size=1 << 30)
+    for block_size in (1, 64, 1000):
+        np.testing.assert_array_equal(minhash_signatures(matrix, num_perm=64, block_size=block_size), expected)
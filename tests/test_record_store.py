@@ -0,0 +1,22 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.record_store import RecordStore, jsonl_sidecar
+
+
+def test_concurrent_sidecar_conversions(tmp_path):
+    path = str(tmp_path / "output.json")
+    records = [{"idx": idx, "text": "응답 " * 50} for idx in range(2000)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        sidecars = list(executor.map(lambda _: jsonl_sidecar(path), range(8)))
+
+    assert set(sidecars) == {path + ".jsonl"}
+    store = RecordStore(path)
+    assert len(store) == 2000
+    assert store[1999] == records[1999]
+    # 임시 파일이 남지 않는다.
+    assert sorted(os.listdir(tmp_path)) == ["output.json", "output.json.jsonl", "output.json.jsonl.idx"]